@@ -1,36 +1,61 @@
 """Router for Gmail-related API endpoints."""
 
-import json
+import asyncio
 import logging
+import string
+import time
+from http import HTTPStatus
 from typing import Annotated, Any, NoReturn
 
 import httpx
+import orjson
 from fastapi import (
     APIRouter,
+    Cookie,
     Depends,
     HTTPException,
     Query,
-    Request,
+    Response,
     status,
 )
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from googleapiclient.errors import HttpError
+from pydantic import BaseModel, ConfigDict
 
+from app.config import settings
 from app.dependencies import get_gmail_client, get_gmail_redirect_uri
-from app.services.gmail.auth import OAuthFlow, exchange_code, oauth_flow
-from app.services.gmail.client import GmailClient
+from app.services.gmail.auth import (
+    TOKEN_CACHE_TTL,
+    OAuthFlow,
+    cache_token_response,
+    exchange_code,
+    get_cached_credentials,
+    oauth_flow,
+)
+from app.services.gmail.client import (
+    BATCH_SIZE,
+    EMAIL_SUMMARY_FIELDS,
+    GmailClient,
+)
+from app.utils.cache import TTLCache, hash_key
 from app.utils.exceptions import raise_server_error
+from app.utils.http_client import get_http_client
+from app.utils.signing import sign_value, unsign_value
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Create router
-router = APIRouter(prefix="/gmail", tags=["gmail"])
+router = APIRouter(
+    prefix="/gmail", tags=["gmail"], default_response_class=ORJSONResponse
+)
 
 
 class EmailResponse(BaseModel):
     """Response model for email data."""
 
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     thread_id: str
     subject: str
@@ -40,11 +65,6 @@ class EmailResponse(BaseModel):
     date: str | None = None
     has_attachments: bool = False
 
-    class Config:
-        """Pydantic model configuration."""
-
-        from_attributes = True
-
 
 class OAuthCredentialsResponse(BaseModel):
     """Response model for OAuth credentials."""
@@ -69,6 +89,52 @@ class OAuthConfig(BaseModel):
 EMAIL = "Email"
 ATTACHMENT = "Attachment"
 
+# Gmail message contents and attachments never change for a given ID, so they
+# are cached per mailbox to spare the per-user API quota on repeat views
+EMAIL_CACHE_TTL = 24 * 60 * 60
+ATTACHMENT_CACHE_TTL = 7 * 24 * 60 * 60
+CACHE_HEADER = "X-Cache"
+
+# Signed cookie identifying the Gmail session of the browser
+SESSION_COOKIE = "gmail_session"
+
+# Email contents are stored with their ETag so expired entries can be revalidated
+email_cache: TTLCache[tuple[str | None, dict[str, Any]]] = TTLCache(
+    maxsize=1024, ttl=EMAIL_CACHE_TTL
+)
+attachment_cache: TTLCache[bytes] = TTLCache(maxsize=128, ttl=ATTACHMENT_CACHE_TTL)
+
+# Email listings change as mail arrives, so they are only fresh for a short
+# while. Stale pages are kept for as long again and served while refreshing
+LIST_CACHE_TTL = 30
+list_cache: TTLCache[tuple[float, list[EmailResponse]]] = TTLCache(
+    maxsize=256, ttl=2 * LIST_CACHE_TTL
+)
+# Pages with a background refresh in flight, and the tasks doing the refresh
+_refreshing_pages: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _mailbox_cache_key(gmail_client: GmailClient, *parts: str) -> str:
+    """
+    Build a cache key scoped to the mailbox the client is authorized for.
+
+    Keys don't depend on the access token, so cached items are still found
+    after the token is refreshed. The mailbox is only looked up from Gmail
+    the first time a token is seen, in a worker thread.
+
+    Args:
+        gmail_client: Gmail client for API access
+        parts: Values identifying the cached item within the mailbox
+
+    Returns:
+        Hashed cache key
+    """
+    mailbox = gmail_client.cached_mailbox()
+    if mailbox is None:
+        mailbox = await asyncio.to_thread(gmail_client.mailbox)
+    return hash_key(mailbox, *parts)
+
 
 def raise_not_found(resource_type: str, resource_id: str) -> NoReturn:
     """
@@ -97,7 +163,7 @@ async def authenticate_gmail() -> OAuthCredentialsResponse:
     """
     try:
         client = GmailClient()
-        credentials = client.authenticate()
+        credentials = await asyncio.to_thread(client.authenticate)
 
         return OAuthCredentialsResponse(
             token=credentials["token"],
@@ -112,8 +178,114 @@ async def authenticate_gmail() -> OAuthCredentialsResponse:
         raise_server_error("Authentication failed", e)
 
 
+async def _fetch_email_page(
+    gmail_client: GmailClient, query: str, max_results: int, page_token: str | None
+) -> list[EmailResponse]:
+    """
+    Fetch one page of email summaries from Gmail.
+
+    Args:
+        gmail_client: Gmail client for API access
+        query: Gmail search query
+        max_results: Maximum number of results to return
+        page_token: Token for pagination
+
+    Returns:
+        List of email metadata
+    """
+    result = await asyncio.to_thread(
+        gmail_client.get_email_list,
+        query=query,
+        max_results=max_results,
+        page_token=page_token,
+    )
+
+    message_ids = [
+        message_meta["id"]
+        for message_meta in result.get("messages", [])
+        if message_meta.get("id")
+    ]
+
+    # Fetch the message summaries in batch requests, running the batches
+    # concurrently so a full page costs roughly one round trip. Bodies
+    # aren't needed for the listing, so only the summary fields are requested
+    batches = [
+        message_ids[start : start + BATCH_SIZE]
+        for start in range(0, len(message_ids), BATCH_SIZE)
+    ]
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                gmail_client.batch_get_messages, batch, EMAIL_SUMMARY_FIELDS
+            )
+            for batch in batches
+        ),
+        return_exceptions=True,
+    )
+
+    contents: dict[str, dict[str, Any]] = {}
+    for batch, batch_result in zip(batches, results, strict=True):
+        if isinstance(batch_result, BaseException):
+            logger.error(
+                f"Error fetching batch of {len(batch)} messages",
+                exc_info=batch_result,
+            )
+            continue
+        contents.update(batch_result)
+
+    messages = []
+    for message_id in message_ids:
+        email_data = contents.get(message_id)
+        if email_data is None:
+            continue
+
+        # Convert to response model format. The parsed data is already
+        # well-typed, so skip validation when building each item
+        messages.append(
+            EmailResponse.model_construct(
+                id=email_data.get("id", ""),
+                thread_id=email_data.get("thread_id", ""),
+                subject=email_data.get("subject", ""),
+                snippet=email_data.get("snippet", ""),
+                from_address=email_data.get("from"),
+                to_address=email_data.get("to"),
+                date=email_data.get("date"),
+                has_attachments=bool(email_data.get("attachments")),
+            )
+        )
+
+    return messages
+
+
+async def _refresh_email_page(
+    cache_key: str,
+    gmail_client: GmailClient,
+    query: str,
+    max_results: int,
+    page_token: str | None,
+) -> None:
+    """
+    Refresh a cached page of email summaries in the background.
+
+    Args:
+        cache_key: Key of the page in the list cache
+        gmail_client: Gmail client for API access
+        query: Gmail search query
+        max_results: Maximum number of results to return
+        page_token: Token for pagination
+    """
+    try:
+        messages = await _fetch_email_page(gmail_client, query, max_results, page_token)
+        list_cache.set(cache_key, (time.monotonic() + LIST_CACHE_TTL, messages))
+    except Exception:
+        logger.exception("Error refreshing cached email list")
+    finally:
+        _refreshing_pages.discard(cache_key)
+
+
 @router.get("/emails", response_model=list[EmailResponse])
 async def list_emails(
+    response: Response,
     gmail_client: Annotated[GmailClient, Depends(get_gmail_client)],
     query: str = "",
     max_results: int = Query(100, gt=0, le=500),
@@ -122,7 +294,12 @@ async def list_emails(
     """
     List emails from Gmail that match the query.
 
+    Recently listed pages are served from the cache. Once a page goes stale
+    it is still returned immediately while a fresh copy is fetched in the
+    background.
+
     Args:
+        response: Outgoing response, used to report cache status
         gmail_client: Gmail client for API access
         query: Gmail search query
         max_results: Maximum number of results to return (1-500)
@@ -132,37 +309,32 @@ async def list_emails(
         List of email metadata
     """
     try:
-        result = gmail_client.get_email_list(
-            query=query, max_results=max_results, page_token=page_token
+        cache_key = await _mailbox_cache_key(
+            gmail_client, query, page_token or "", str(max_results)
         )
-
-        # Get full content for each message
-        messages = []
-        for message_meta in result.get("messages", []):
-            try:
-                message_id = message_meta.get("id")
-                if not message_id:
-                    continue
-
-                email_data = gmail_client.get_email_content(message_id)
-
-                # Convert to response model format
-                messages.append(
-                    EmailResponse(
-                        id=email_data.get("id", ""),
-                        thread_id=email_data.get("thread_id", ""),
-                        subject=email_data.get("subject", ""),
-                        snippet=email_data.get("snippet", ""),
-                        from_address=email_data.get("from"),
-                        to_address=email_data.get("to"),
-                        date=email_data.get("date"),
-                        has_attachments=bool(email_data.get("attachments")),
+        cached = list_cache.get(cache_key)
+        if cached is not None:
+            fresh_until, messages = cached
+            if time.monotonic() < fresh_until:
+                response.headers[CACHE_HEADER] = "HIT"
+                return messages
+
+            if cache_key not in _refreshing_pages:
+                _refreshing_pages.add(cache_key)
+                task = asyncio.create_task(
+                    _refresh_email_page(
+                        cache_key, gmail_client, query, max_results, page_token
                     )
                 )
-            except Exception:
-                logger.exception(f"Error processing message {message_meta.get('id')}")
-                continue
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+
+            response.headers[CACHE_HEADER] = "STALE"
+            return messages
 
+        messages = await _fetch_email_page(gmail_client, query, max_results, page_token)
+        list_cache.set(cache_key, (time.monotonic() + LIST_CACHE_TTL, messages))
+        response.headers[CACHE_HEADER] = "MISS"
         return messages
     except Exception as e:
         logger.exception("Error listing emails")
@@ -171,24 +343,58 @@ async def list_emails(
 
 @router.get("/emails/{email_id}", response_model=dict)
 async def get_email(
-    email_id: str, gmail_client: Annotated[GmailClient, Depends(get_gmail_client)]
+    email_id: str,
+    response: Response,
+    gmail_client: Annotated[GmailClient, Depends(get_gmail_client)],
 ) -> dict:
     """
     Get detailed content of a specific email.
 
     Args:
         email_id: Gmail message ID
+        response: Outgoing response, used to report cache status
         gmail_client: Gmail client for API access
 
     Returns:
         Full email content including body and metadata
     """
     try:
-        email_data = gmail_client.get_email_content(email_id)
+        cache_key = await _mailbox_cache_key(gmail_client, email_id)
+        cached = email_cache.get_entry(cache_key)
+        if cached is not None and cached[1]:
+            response.headers[CACHE_HEADER] = "HIT"
+            return cached[0][1]
+
+        # Revalidate an expired copy by its ETag so an unchanged message only
+        # costs a 304 instead of a full download
+        cached_etag = cached[0][0] if cached is not None else None
+        try:
+            email_data, etag = await asyncio.to_thread(
+                gmail_client.get_email_content_conditional, email_id, cached_etag
+            )
+        except Exception as e:
+            if isinstance(e, HttpError) and e.resp.status == HTTPStatus.NOT_FOUND:
+                raise_not_found(EMAIL, email_id)
+            if cached is None:
+                raise
+            # The message can't change, so a stale copy beats failing while
+            # Gmail is unavailable or unreachable
+            logger.warning(
+                "Serving stale email %s, revalidation failed: %s", email_id, e
+            )
+            response.headers[CACHE_HEADER] = "STALE"
+            return cached[0][1]
+
+        if email_data is None and cached is not None:
+            email_cache.set(cache_key, cached[0])
+            response.headers[CACHE_HEADER] = "REVALIDATED"
+            return cached[0][1]
 
         if not email_data:
             raise_not_found(EMAIL, email_id)
 
+        email_cache.set(cache_key, (etag, email_data))
+        response.headers[CACHE_HEADER] = "MISS"
         return email_data
     except HTTPException:
         raise
@@ -197,12 +403,12 @@ async def get_email(
         raise_server_error("Failed to retrieve email", e)
 
 
-@router.get("/emails/{email_id}/attachments/{attachment_id}")
+@router.get("/emails/{email_id}/attachments/{attachment_id}", response_class=Response)
 async def get_attachment(
     email_id: str,
     attachment_id: str,
     gmail_client: Annotated[GmailClient, Depends(get_gmail_client)],
-) -> bytes:
+) -> Response:
     """
     Get a specific attachment from an email.
 
@@ -212,16 +418,33 @@ async def get_attachment(
         gmail_client: Gmail client for API access
 
     Returns:
-        Binary attachment data
+        Binary attachment data as a file download
     """
     try:
-        attachment_data = gmail_client.get_attachment(email_id, attachment_id)
+        cache_key = await _mailbox_cache_key(gmail_client, email_id, attachment_id)
+        attachment_data = attachment_cache.get(cache_key)
+        cache_status = "HIT"
+
+        if attachment_data is None:
+            attachment_data = await asyncio.to_thread(
+                gmail_client.get_attachment, email_id, attachment_id
+            )
 
-        if not attachment_data:
-            raise_not_found(ATTACHMENT, attachment_id)
+            if not attachment_data:
+                raise_not_found(ATTACHMENT, attachment_id)
 
-        # Returning binary response
-        return attachment_data
+            attachment_cache.set(cache_key, attachment_data)
+            cache_status = "MISS"
+
+        # Send the raw bytes as-is rather than serializing them into JSON
+        return Response(
+            content=attachment_data,
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{attachment_id}"',
+                CACHE_HEADER: cache_status,
+            },
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -246,7 +469,9 @@ async def google_signin(request: GoogleSignInRequest) -> dict[str, Any]:
 
         # Exchange the Google credential for Gmail OAuth access
         # This will verify the token and request Gmail access
-        return flow_instance.exchange_google_credential(request.credential)
+        return await asyncio.to_thread(
+            flow_instance.exchange_google_credential, request.credential
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -280,126 +505,171 @@ async def get_auth_url(
         raise_server_error("Failed to get authentication URL", e)
 
 
+# Page returned by the OAuth callback; it stores the token and profile in the
+# browser and sends the user back to the app
+AUTH_CALLBACK_TEMPLATE = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Authentication Successful</title>
+    <script>
+        // Store the token in localStorage
+        localStorage.setItem('gmailToken', $access_token);
+
+        // Store actual user info from Google
+        const userInfo = $user_info;
+
+        // Store the user info
+        localStorage.setItem('gmailUserInfo', JSON.stringify(userInfo));
+
+        // Log the stored info
+        console.log('Token stored:', localStorage.getItem('gmailToken'));
+        console.log('User info stored:', localStorage.getItem('gmailUserInfo'));
+
+        // Redirect to main page
+        window.location.href = '/';
+    </script>
+</head>
+<body>
+    <h1>Authentication Successful</h1>
+    <p>You have successfully authenticated with Gmail.
+       Redirecting back to the application...</p>
+</body>
+</html>
+""")
+
+
+def _script_literal(json_value: str) -> str:
+    """
+    Make a JSON value safe to embed in an inline script block.
+
+    Args:
+        json_value: JSON-encoded value
+
+    Returns:
+        The JSON value with "<" escaped so it can't close the script element
+    """
+    return json_value.replace("<", "\\u003c")
+
+
 @router.get("/auth-callback", response_model=None)
 @router.post("/auth-callback", response_model=None)
-async def auth_callback(code: str) -> HTMLResponse:
+async def auth_callback(
+    code: str,
+    http_client: Annotated[httpx.AsyncClient, Depends(get_http_client)],
+) -> HTMLResponse:
     """Handle the OAuth callback from Gmail."""
     try:
         # Exchange the authorization code for tokens
         logger.info("Received authorization code, exchanging for token")
         token_response = await exchange_code(code, get_gmail_redirect_uri())
+        cache_token_response(token_response)
 
         # Get the access token for making API calls
         access_token = token_response.get("access_token", "")
 
         # Fetch user profile information from Google
-        user_info = await fetch_user_profile(access_token)
+        user_info = await fetch_user_profile(access_token, http_client)
 
         # Create HTML response that stores token and redirects
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Successful</title>
-            <script>
-                // Store the token in localStorage
-                localStorage.setItem('gmailToken', '{access_token}');
-
-                // Store actual user info from Google
-                const userInfo = {user_info};
-
-                // Store the user info
-                localStorage.setItem('gmailUserInfo', JSON.stringify(userInfo));
-
-                // Log the stored info
-                console.log('Token stored:', localStorage.getItem('gmailToken'));
-                console.log('User info stored:', localStorage.getItem('gmailUserInfo'));
-
-                // Redirect to main page
-                window.location.href = '/';
-            </script>
-        </head>
-        <body>
-            <h1>Authentication Successful</h1>
-            <p>You have successfully authenticated with Gmail.
-               Redirecting back to the application...</p>
-        </body>
-        </html>
-        """
-
-        return HTMLResponse(content=html_content)
+        html_content = AUTH_CALLBACK_TEMPLATE.substitute(
+            access_token=_script_literal(orjson.dumps(access_token).decode()),
+            user_info=_script_literal(user_info),
+        )
+
+        response = HTMLResponse(content=html_content)
+        response.set_cookie(
+            SESSION_COOKIE,
+            sign_value({"token": access_token}),
+            max_age=TOKEN_CACHE_TTL,
+            httponly=True,
+            secure=not settings.DEBUG,
+            samesite="lax",
+        )
+        return response
     except Exception as e:
         logger.exception("Error in auth callback")
         raise_server_error("Failed to process OAuth callback", e)
 
 
-async def fetch_user_profile(access_token: str) -> str:
-    """Fetch user profile information from Google using the access token."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v1/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
+async def fetch_user_profile(access_token: str, http_client: httpx.AsyncClient) -> str:
+    """
+    Fetch user profile information from Google using the access token.
 
-            if response.status_code == 200:
-                # Get user profile data and convert to JSON string for template
-                profile_data = response.json()
-                # Format as a JS object string
-                return json.dumps(
-                    {
-                        "name": profile_data.get("name", "Gmail User"),
-                        "email": profile_data.get("email", "gmail@user.com"),
-                        "picture": profile_data.get("picture", ""),
-                    }
-                )
+    Request errors are left to the caller, which logs them once.
+    """
+    response = await http_client.get(
+        "https://www.googleapis.com/oauth2/v1/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
 
-            # If not successful response
-            error_msg = f"Failed to fetch user profile: {response.status_code}"
-            logger.error(error_msg)
-            return json.dumps(
-                {"name": "Gmail User", "email": "gmail@user.com", "picture": ""}
-            )
-    except Exception as e:
-        logger.exception("Error fetching user profile")
-        raise_server_error("Failed to fetch user profile", e)
+    if response.status_code == 200:
+        # Get user profile data and convert to JSON string for template
+        profile_data = orjson.loads(response.content)
+        # Format as a JS object string
+        return orjson.dumps(
+            {
+                "name": profile_data.get("name", "Gmail User"),
+                "email": profile_data.get("email", "gmail@user.com"),
+                "picture": profile_data.get("picture", ""),
+            }
+        ).decode()
+
+    # If not successful response
+    error_msg = f"Failed to fetch user profile: {response.status_code}"
+    logger.error(error_msg)
+    return orjson.dumps(
+        {"name": "Gmail User", "email": "gmail@user.com", "picture": ""}
+    ).decode()
 
 
 @router.get("/validate-token")
-async def validate_gmail_token(request: Request) -> JSONResponse:
+async def validate_gmail_token(
+    http_client: Annotated[httpx.AsyncClient, Depends(get_http_client)],
+    gmail_session: Annotated[str | None, Cookie()] = None,
+) -> ORJSONResponse:
     """
     Validates if the provided Gmail token is still valid.
 
     Args:
-        request: The FastAPI request object
+        http_client: HTTP client used to refresh cached credentials
+        gmail_session: Signed session cookie set by the OAuth callback
 
     Returns:
-        JSONResponse: A JSON response indicating if the token is valid
+        ORJSONResponse: A JSON response indicating if the token is valid
     """
     try:
-        # Get the token from the session
-        token = request.session.get("gmail_token")
+        # Get the token from the signed session cookie
+        session = (
+            unsign_value(gmail_session, max_age=TOKEN_CACHE_TTL)
+            if gmail_session
+            else None
+        )
+        token = session.get("token") if session else None
         if not token:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=401,
                 content={"valid": False, "message": "No Gmail token found in session"},
             )
 
         # Create a Gmail client with the token
-        gmail_client = GmailClient(token=token)
+        credentials = await get_cached_credentials(token, http_client) or {
+            "token": token
+        }
+        gmail_client = GmailClient(credentials)
 
         # Try to make a simple API call to validate the token
         # This will throw an exception if the token is invalid
-        gmail_client.list_labels()
+        await asyncio.to_thread(gmail_client.get_profile)
 
         # If we get here, the token is valid
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={"valid": True, "message": "Gmail token is valid"},
         )
     except Exception as e:
         logger.exception("Gmail token validation error")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=401,
             content={"valid": False, "message": f"Gmail token is invalid: {str(e)}"},
         )
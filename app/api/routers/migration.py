@@ -1,19 +1,23 @@
 """Router for email migration API endpoints."""
 
 import asyncio
-import json
 import logging
-from collections.abc import AsyncGenerator
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, NoReturn
 
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, Field
 from sse_starlette.sse import EventSourceResponse
 
 from app.services.gmail.client import GmailClient
 from app.services.migration.gmail_to_outlook import GmailToOutlookMigrationService
 from app.services.outlook.client import OutlookClient
+from app.utils.cache import TTLCache, hash_key
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -21,68 +25,265 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/migration", tags=["migration"])
 
-# Global migration state for real-time updates
-migration_state = {
-    "status": "idle",  # idle, running, completed, failed
-    "total_emails": 0,
-    "processed_emails": 0,
-    "successful_emails": 0,
-    "failed_emails": 0,
-    "current_label": "",
-    "total_labels": 0,
-    "processed_labels": 0,
-    "logs": [],
-}
+# Maximum number of log lines kept per migration job
+MAX_LOG_ENTRIES = 100
 
-# Queue for migration updates
-migration_updates_queue = asyncio.Queue()
+# Maximum number of migration jobs tracked at once
+MAX_MIGRATION_JOBS = 64
 
-# List of connected clients for SSE
-connected_clients = []
+# Seconds a migration job is kept after it was last started or subscribed to
+MIGRATION_JOB_TTL = 24 * 60 * 60
+
+# Seconds to wait before broadcasting so bursts of updates are sent once
+STATE_COALESCE_DELAY = 0.05
+
+# Statuses broadcast immediately so clients never miss the end of a run
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+# Seconds between keep-alive comments on idle SSE streams, well below the
+# 60 second idle timeout of common proxies and load balancers
+SSE_PING_INTERVAL = 20
+
+# Destination providers accepted by the migration endpoints
+SUPPORTED_PROVIDERS = frozenset({"outlook", "yahoo"})
+
+# Status updates a migration may queue before it waits for them to be applied
+STATUS_EVENT_QUEUE_SIZE = 1024
+
+# Job ids supplied by clients, e.g. a UUID generated by the dashboard
+JOB_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+def _sse_message(data: dict[str, Any]) -> bytes:
+    """
+    Encode data as a complete Server-Sent Events message.
+
+    EventSourceResponse writes bytes chunks to the socket unchanged, so a
+    message framed here once is sent to every subscriber without being
+    decoded, re-framed and re-encoded per connection. orjson never emits
+    newlines, so the JSON always fits on a single data line.
+
+    Args:
+        data: The data to send
+
+    Returns:
+        The encoded SSE message
+    """
+    return b"data: " + orjson.dumps(data) + b"\r\n\r\n"
+
+
+@dataclass(slots=True)
+class MigrationJob:
+    """State of a single migration run, streamed to clients over SSE."""
+
+    job_id: str
+    status: str = "idle"  # idle, running, completed, failed
+    total_emails: int = 0
+    processed_emails: int = 0
+    successful_emails: int = 0
+    failed_emails: int = 0
+    current_label: str = ""
+    total_labels: int = 0
+    processed_labels: int = 0
+    logs: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_LOG_ENTRIES))
+
+    # Condition notified whenever the job state is broadcast
+    cond: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    # Incremented on every broadcast so subscribers can tell what they missed
+    version: int = field(default=0, repr=False)
+
+    # Complete SSE message with the serialized state, shared by all subscribers
+    payload: bytes = field(default=b"", repr=False)
+
+    # Pending delayed broadcast, if one is scheduled
+    pending_publish: asyncio.Task | None = field(default=None, repr=False)
+
+    # Number of migrations currently reporting to the job
+    active_runs: int = field(default=0, repr=False)
+
+    def __post_init__(self) -> None:
+        """Serialize the initial state for the first subscribers."""
+        self.payload = _sse_message(self.to_dict())
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Get the public state of the job.
+
+        Returns:
+            dict: The job state as sent to clients
+        """
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total_emails": self.total_emails,
+            "processed_emails": self.processed_emails,
+            "successful_emails": self.successful_emails,
+            "failed_emails": self.failed_emails,
+            "current_label": self.current_label,
+            "total_labels": self.total_labels,
+            "processed_labels": self.processed_labels,
+            "logs": list(self.logs),
+        }
+
+
+# Job updated by clients that do not pass a job id
+default_job = MigrationJob(job_id="default")
+
+# Migration jobs started with an explicit job id
+migration_jobs: TTLCache[MigrationJob] = TTLCache(
+    maxsize=MAX_MIGRATION_JOBS, ttl=MIGRATION_JOB_TTL
+)
+
+# Jobs with a migration in progress. Anyone can create jobs, so these are
+# kept outside the LRU above, where a burst of new job ids could evict them
+# and break their status streams
+_running_jobs: dict[str, MigrationJob] = {}
+
+
+def get_migration_job(job_id: str | None) -> MigrationJob:
+    """
+    Get a migration job, creating it if it does not exist yet.
+
+    Creating jobs on lookup lets a client subscribe to a job's status
+    stream before starting the migration that reports to it.
+
+    Args:
+        job_id: Client-supplied job ID, or None for the default job
+
+    Returns:
+        MigrationJob: The job with the given ID
+    """
+    if job_id is None:
+        return default_job
+
+    job = _running_jobs.get(job_id) or migration_jobs.get(job_id)
+    if job is None:
+        job = MigrationJob(job_id=job_id)
+        migration_jobs.set(job_id, job)
+    return job
+
+
+async def _publish_state(job: MigrationJob) -> None:
+    """Serialize the job state once and wake all of its SSE subscribers."""
+    async with job.cond:
+        job.payload = _sse_message(job.to_dict())
+        job.version += 1
+        job.cond.notify_all()
+
+
+async def _publish_state_later(job: MigrationJob) -> None:
+    """Broadcast the job state once the coalescing window has passed."""
+    await asyncio.sleep(STATE_COALESCE_DELAY)
+    job.pending_publish = None
+    await _publish_state(job)
 
 
 # Function to update migration state
-async def update_migration_state(update: dict) -> None:
+async def update_migration_state(job: MigrationJob, update: dict) -> None:
     """
-    Update the migration state and send updates to clients.
+    Update the state of a migration job and send updates to clients.
+
+    The state itself changes immediately, but the broadcast is delayed by
+    STATE_COALESCE_DELAY so that the per-email progress updates of a fast
+    migration reach clients as a single snapshot. Terminal statuses are
+    broadcast right away.
 
     Args:
-        update: Dictionary with state updates
+        job: The migration job to update
+        update: Dictionary with state updates, consumed by the call
     """
-    logger.info(f"Received migration state update: {update}")
+    # Pop the log entry first, so the update is logged as it is applied.
+    # That leaves only plain state fields, so the loop below needs no
+    # per-key check
+    log_entry = update.pop("logs", None)
+
+    # Lazy formatting: this runs for every progress update of a migration
+    logger.info(
+        "Received migration state update for job %s: %s (log: %s)",
+        job.job_id,
+        update,
+        log_entry,
+    )
 
     # Update logs if provided
-    if "logs" in update:
-        log_entry = update["logs"]
-
+    if log_entry is not None:
         # Add timestamp if not present
         if not log_entry.startswith("["):
             timestamp = datetime.now(tz=UTC).strftime("%H:%M:%S")
             log_entry = f"[{timestamp}] {log_entry}"
 
-        migration_state["logs"].append(log_entry)
-
-        # Keep only the last 100 log entries
-        if len(migration_state["logs"]) > 100:
-            migration_state["logs"] = migration_state["logs"][-100:]
+        # The deque drops the oldest entry once MAX_LOG_ENTRIES is reached
+        job.logs.append(log_entry)
 
     # Update other state fields
     for key, value in update.items():
-        if key != "logs":
-            migration_state[key] = value
+        setattr(job, key, value)
 
     # Notify all connected clients
-    for queue in connected_clients:
-        await queue.put(json.dumps(migration_state))
+    if update.get("status") in TERMINAL_STATUSES:
+        if job.pending_publish is not None:
+            job.pending_publish.cancel()
+            job.pending_publish = None
+        await _publish_state(job)
+    elif job.pending_publish is None:
+        job.pending_publish = asyncio.create_task(_publish_state_later(job))
+
+
+async def _publish_events(job: MigrationJob, events: asyncio.Queue[dict]) -> None:
+    """
+    Apply the status updates queued by a migration to its job.
+
+    Args:
+        job: The migration job to update
+        events: Queue of status updates produced by the migration
+    """
+    while True:
+        update = await events.get()
+        try:
+            await update_migration_state(job, update)
+        except Exception:
+            logger.exception("Failed to apply migration state update")
+        finally:
+            events.task_done()
 
 
-class LabelMappingResponse(BaseModel):
-    """Response model for label to folder mapping."""
+@asynccontextmanager
+async def _report_progress(
+    job: MigrationJob, migration_service: GmailToOutlookMigrationService
+) -> AsyncIterator[None]:
+    """
+    Report a migration service's progress to a job while the context is active.
+
+    The service only queues its updates; a single publisher task applies
+    them, so the migration loop never waits on SSE subscribers. The job
+    can't be evicted while the context is active.
+
+    Args:
+        job: The migration job to update
+        migration_service: The service performing the migration
+    """
+    if job is not default_job:
+        job.active_runs += 1
+        _running_jobs[job.job_id] = job
 
-    gmail_label_id: str
-    outlook_folder_id: str
-    gmail_label_name: str
-    outlook_folder_name: str
+    events: asyncio.Queue[dict] = asyncio.Queue(maxsize=STATUS_EVENT_QUEUE_SIZE)
+    migration_service.status_events = events
+    publisher = asyncio.create_task(_publish_events(job, events))
+    try:
+        yield
+    finally:
+        # Apply every queued update before reporting the final state
+        await events.join()
+        publisher.cancel()
+        migration_service.status_events = None
+
+        if job is not default_job:
+            job.active_runs -= 1
+            if not job.active_runs:
+                # Keep the finished job around for clients that check on it
+                del _running_jobs[job.job_id]
+                migration_jobs.set(job.job_id, job)
 
 
 class MigrationResultsResponse(BaseModel):
@@ -99,6 +300,8 @@ class MigrationResultsResponse(BaseModel):
 class CredentialsModel(BaseModel):
     """Model for credentials."""
 
+    model_config = ConfigDict(frozen=True)
+
     token: str
     user_info: dict | None = None
     client_id: str = ""
@@ -110,6 +313,8 @@ class CredentialsModel(BaseModel):
 class DestinationCredentialsModel(BaseModel):
     """Model for destination credentials."""
 
+    model_config = ConfigDict(frozen=True)
+
     token: str
     provider: str
 
@@ -117,6 +322,8 @@ class DestinationCredentialsModel(BaseModel):
 class CredentialsRequest(BaseModel):
     """Request model for credentials."""
 
+    model_config = ConfigDict(frozen=True)
+
     gmail: CredentialsModel
     destination: DestinationCredentialsModel
 
@@ -129,6 +336,9 @@ class LabelMigrationRequest(BaseModel):
         100, description="Maximum number of emails to migrate", ge=1, le=1000
     )
     credentials: CredentialsRequest | None = None
+    job_id: str | None = Field(
+        None, description="Migration job to report to", pattern=JOB_ID_PATTERN
+    )
 
 
 class FullMigrationRequest(BaseModel):
@@ -141,104 +351,279 @@ class FullMigrationRequest(BaseModel):
         le=1000,
     )
     credentials: CredentialsRequest | None = None
+    job_id: str | None = Field(
+        None, description="Migration job to report to", pattern=JOB_ID_PATTERN
+    )
 
 
-def _raise_bad_request(error_msg: str) -> None:
+def _raise_bad_request(error_msg: str, error: Exception | None = None) -> NoReturn:
     """
-    Raise a bad request HTTP exception.
+    Log a migration error and raise a bad request HTTP exception.
+
+    This is the only place migration errors are logged, so callers don't log
+    them again.
 
     Args:
         error_msg: Error message to include in the exception
+        error: Unexpected exception behind the error, logged with its traceback
     """
-    logger.error(f"Migration error: {error_msg}")
+    logger.error("Migration error: %s", error_msg, exc_info=error)
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail=error_msg,
-    )
+    ) from error
 
 
 def _validate_credentials(credentials: CredentialsRequest | None) -> None:
     """Validate that credentials are provided and contain required fields."""
+    # _raise_bad_request logs the error, so the checks below don't
     if not credentials:
-        logger.error("Credentials are required but none were provided")
         _raise_bad_request("Credentials are required")
 
     # Validate Gmail credentials
     if not credentials.gmail or not credentials.gmail.token:
-        logger.error("Gmail credentials are missing or invalid")
         _raise_bad_request("Gmail credentials are required")
 
     # Validate destination credentials
     if not credentials.destination or not credentials.destination.token:
-        logger.error("Destination credentials are missing or invalid")
         _raise_bad_request("Destination credentials are required")
 
     # Validate destination provider
-    if credentials.destination.provider not in ["outlook", "yahoo"]:
-        logger.error(
-            f"Unsupported destination provider: {credentials.destination.provider}"
-        )
+    if credentials.destination.provider not in SUPPORTED_PROVIDERS:
         _raise_bad_request(
             f"Unsupported destination provider: {credentials.destination.provider}"
         )
 
 
-@router.get("/status/stream")
-async def stream_migration_status() -> EventSourceResponse:
+# Maximum number of API clients pooled per provider
+CLIENT_POOL_SIZE = 64
+
+# Seconds a pooled API client is kept after it was created
+CLIENT_POOL_TTL = 60 * 60
+
+# Clients are reused across requests with the same credentials, so the built
+# Gmail service and the clients' HTTP connections stay warm between calls
+_gmail_clients: TTLCache[GmailClient] = TTLCache(
+    maxsize=CLIENT_POOL_SIZE, ttl=CLIENT_POOL_TTL
+)
+_outlook_clients: TTLCache[OutlookClient] = TTLCache(
+    maxsize=CLIENT_POOL_SIZE, ttl=CLIENT_POOL_TTL
+)
+
+# Migration services for pairs of pooled clients, so the label to folder
+# mapping built by one request is reused by the next
+_migration_services: TTLCache[GmailToOutlookMigrationService] = TTLCache(
+    maxsize=CLIENT_POOL_SIZE, ttl=CLIENT_POOL_TTL
+)
+
+
+def _gmail_client_key(credentials: CredentialsModel) -> str:
+    """Build the pool key for a set of Gmail credentials."""
+    return hash_key(
+        credentials.token,
+        credentials.refresh_token,
+        credentials.client_id,
+        credentials.client_secret,
+        credentials.token_uri,
+    )
+
+
+def _get_gmail_client(credentials: CredentialsModel) -> GmailClient:
     """
-    Stream migration status updates using Server-Sent Events (SSE).
+    Get a pooled Gmail client for the given credentials.
+
+    Args:
+        credentials: Gmail credentials from the request
 
     Returns:
-        EventSourceResponse: A streaming response for SSE
+        GmailClient: A client authenticated with the credentials
     """
-    queue = asyncio.Queue()
-    connected_clients.append(queue)
+    key = _gmail_client_key(credentials)
+    client = _gmail_clients.get(key)
+    if client is None:
+        client = GmailClient(
+            credentials={
+                "token": credentials.token,
+                "refresh_token": credentials.refresh_token,
+                "client_id": credentials.client_id,
+                "client_secret": credentials.client_secret,
+                "token_uri": credentials.token_uri,
+            }
+        )
+        _gmail_clients.set(key, client)
+    return client
 
-    logger.info("New SSE connection established for migration status")
 
-    async def event_generator() -> AsyncGenerator[str, None]:
-        # Send the current state immediately
-        logger.info(f"Sending initial migration state: {json.dumps(migration_state)}")
-        yield json.dumps(migration_state)
+def _get_outlook_client(access_token: str) -> OutlookClient:
+    """
+    Get a pooled Outlook client for the given access token.
 
-        try:
-            while True:
-                data = await queue.get()
-                if data is None:
-                    break
-                yield data
-        except asyncio.CancelledError:
-            logger.info("SSE connection closed by client")
-            connected_clients.remove(queue)
-            raise
-        finally:
-            if queue in connected_clients:
-                connected_clients.remove(queue)
-                logger.info("SSE connection closed and removed from connected clients")
+    Args:
+        access_token: Microsoft Graph access token from the request
+
+    Returns:
+        OutlookClient: A client authenticated with the token
+    """
+    key = hash_key(access_token)
+    client = _outlook_clients.get(key)
+    if client is None:
+        client = OutlookClient(access_token=access_token)
+        _outlook_clients.set(key, client)
+    return client
 
-    return EventSourceResponse(event_generator())
+
+async def _get_clients(
+    credentials: CredentialsRequest,
+) -> tuple[GmailClient, OutlookClient]:
+    """
+    Get the pooled Gmail and Outlook clients for a request.
+
+    Building a Gmail client parses the API discovery document, so it runs in
+    a worker thread, overlapping with the Outlook client setup instead of
+    blocking the event loop.
+
+    Args:
+        credentials: Credentials from the request
+
+    Returns:
+        Tuple of the Gmail client and the Outlook client
+    """
+    gmail_client = asyncio.create_task(
+        asyncio.to_thread(_get_gmail_client, credentials.gmail)
+    )
+    outlook_client = _get_outlook_client(credentials.destination.token)
+    return await gmail_client, outlook_client
+
+
+def _get_migration_service(
+    gmail_client: GmailClient, outlook_client: OutlookClient
+) -> GmailToOutlookMigrationService:
+    """
+    Get the migration service for a pair of pooled clients.
+
+    Services are keyed by client identity. That is stable because the pooled
+    clients are reused, and safe because a cached service keeps its clients
+    alive, so their ids can't be recycled while the entry exists.
+
+    Args:
+        gmail_client: Pooled Gmail client
+        outlook_client: Pooled Outlook client
+
+    Returns:
+        GmailToOutlookMigrationService: A service that is not currently running
+    """
+    key = f"{id(gmail_client)}:{id(outlook_client)}"
+    service = _migration_services.get(key)
+    if service is None:
+        service = GmailToOutlookMigrationService(
+            gmail_client=gmail_client, outlook_client=outlook_client
+        )
+        _migration_services.set(key, service)
+    elif service.status_events is not None:
+        # Another request is migrating with this service; run on a copy that
+        # starts from its folder mapping instead of sharing its progress queue
+        busy_service = service
+        service = GmailToOutlookMigrationService(
+            gmail_client=gmail_client, outlook_client=outlook_client
+        )
+        service.folder_mapping = dict(busy_service.folder_mapping)
+    return service
+
+
+def _evict_clients(credentials: CredentialsRequest | None) -> None:
+    """
+    Drop the pooled clients for a request so the next call starts afresh.
+
+    Args:
+        credentials: Credentials of the failed request
+    """
+    if not credentials:
+        return
+
+    _gmail_clients.pop(_gmail_client_key(credentials.gmail))
+    _outlook_clients.pop(hash_key(credentials.destination.token))
+
+
+async def _state_events(job: MigrationJob) -> AsyncGenerator[bytes, None]:
+    """
+    Yield the serialized state of a migration job whenever it changes.
+
+    Subscribers never queue snapshots: a client that falls behind skips
+    straight to the latest state, so a stalled connection costs nothing
+    beyond a reference to the shared payload.
+
+    Args:
+        job: The migration job to follow
+
+    Yields:
+        The current job state as an encoded SSE message
+    """
+    # Send the current state immediately
+    seen_version = job.version
+
+    def has_update() -> bool:
+        return job.version != seen_version
+
+    logger.debug("Sending initial migration state: %s", job.payload)
+    yield job.payload
+
+    try:
+        while True:
+            async with job.cond:
+                await job.cond.wait_for(has_update)
+                payload, seen_version = job.payload, job.version
+            yield payload
+    except asyncio.CancelledError:
+        logger.info("SSE connection closed by client")
+        raise
+
+
+@router.get("/status/stream")
+async def stream_migration_status(
+    job_id: str | None = Query(None, pattern=JOB_ID_PATTERN),
+) -> EventSourceResponse:
+    """
+    Stream migration status updates using Server-Sent Events (SSE).
+
+    Args:
+        job_id: Migration job to follow, defaults to the shared job
+
+    Returns:
+        EventSourceResponse: A streaming response for SSE
+    """
+    logger.info("New SSE connection established for migration status")
+    return EventSourceResponse(
+        _state_events(get_migration_job(job_id)), ping=SSE_PING_INTERVAL
+    )
 
 
 @router.get("/status")
-async def get_migration_status() -> dict:
+async def get_migration_status(
+    job_id: str | None = Query(None, pattern=JOB_ID_PATTERN),
+) -> dict:
     """
     Get the current migration status.
 
+    Args:
+        job_id: Migration job to report on, defaults to the shared job
+
     Returns:
         dict: The current migration state
     """
-    return migration_state
+    return get_migration_job(job_id).to_dict()
 
 
 @router.post("/gmail-to-outlook/labels", response_model=dict[str, str])
 async def migrate_labels_to_folders(
     request: LabelMigrationRequest,
+    response: Response,
 ) -> dict[str, str]:
     """
     Migrate Gmail labels to Outlook folders.
 
     Args:
         request: The migration request containing credentials.
+        response: The outgoing response, used to report the job ID.
 
     Returns:
         A dictionary mapping Gmail label IDs to Outlook folder IDs.
@@ -247,66 +632,58 @@ async def migrate_labels_to_folders(
         # Validate credentials
         _validate_credentials(request.credentials)
 
-        # Extract credentials
-        gmail_creds = request.credentials.gmail
-        outlook_creds = request.credentials.destination
-
         # Create clients
-        gmail_client = GmailClient(
-            credentials={
-                "token": gmail_creds.token,
-                "refresh_token": gmail_creds.refresh_token,
-                "client_id": gmail_creds.client_id,
-                "client_secret": gmail_creds.client_secret,
-                "token_uri": gmail_creds.token_uri,
-            }
-        )
-
-        outlook_client = OutlookClient(access_token=outlook_creds.token)
+        gmail_client, outlook_client = await _get_clients(request.credentials)
 
         # Create migration service
-        migration_service = GmailToOutlookMigrationService(
-            gmail_client=gmail_client, outlook_client=outlook_client
-        )
+        migration_service = _get_migration_service(gmail_client, outlook_client)
 
-        # Set the update status callback
-        migration_service.update_status_callback = update_migration_state
+        # Report progress to the requested job
+        job = get_migration_job(request.job_id)
+        response.headers["X-Migration-Job-Id"] = job.job_id
 
         # Update initial migration state
         await update_migration_state(
+            job,
             {
                 "status": "running",
                 "logs": "Migrating Gmail labels to Outlook folders...",
-            }
+            },
         )
 
         # Migrate labels to folders
-        folder_mapping = await migration_service.migrate_labels_to_folders()
+        async with _report_progress(job, migration_service):
+            folder_mapping = await migration_service.migrate_labels_to_folders()
 
         # Update final migration state
         await update_migration_state(
-            {"logs": f"Successfully migrated {len(folder_mapping)} labels to folders"}
+            job,
+            {"logs": f"Successfully migrated {len(folder_mapping)} labels to folders"},
         )
 
         return folder_mapping
 
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except HTTPException as e:
+        # Drop pooled clients whose credentials were rejected
+        if e.status_code == status.HTTP_401_UNAUTHORIZED:
+            _evict_clients(request.credentials)
         raise
-    except Exception as e:
-        logger.exception("Migration error")
-        _raise_bad_request(f"Failed to migrate labels: {str(e)}")
+    except Exception as e:  # noqa: BLE001
+        _evict_clients(request.credentials)
+        _raise_bad_request(f"Failed to migrate labels: {str(e)}", e)
 
 
 @router.post("/gmail-to-outlook/by-label", response_model=MigrationResultsResponse)
 async def migrate_emails_by_label(
     request: LabelMigrationRequest,
+    response: Response,
 ) -> dict[str, Any]:
     """
     Migrate emails from a specific Gmail label to the corresponding Outlook folder.
 
     Args:
         request: Migration request parameters
+        response: The outgoing response, used to report the job ID
 
     Returns:
         Migration results
@@ -316,19 +693,18 @@ async def migrate_emails_by_label(
             _raise_bad_request("Credentials are required")
 
         # Create clients with the provided credentials
-        gmail_client = GmailClient(credentials=request.credentials.gmail.dict())
-        outlook_client = OutlookClient(request.credentials.destination.token)
+        gmail_client, outlook_client = await _get_clients(request.credentials)
 
         # Create migration service
-        migration_service = GmailToOutlookMigrationService(
-            gmail_client=gmail_client, outlook_client=outlook_client
-        )
+        migration_service = _get_migration_service(gmail_client, outlook_client)
 
-        # Set the update status callback
-        migration_service.update_status_callback = update_migration_state
+        # Report progress to the requested job
+        job = get_migration_job(request.job_id)
+        response.headers["X-Migration-Job-Id"] = job.job_id
 
         # Update initial migration state
         await update_migration_state(
+            job,
             {
                 "status": "running",
                 "total_emails": 0,
@@ -339,16 +715,18 @@ async def migrate_emails_by_label(
                 "total_labels": 1,
                 "processed_labels": 0,
                 "logs": f"Starting migration for label: {request.label_id}",
-            }
+            },
         )
 
         # Migrate emails
-        migration_result = await migration_service.migrate_emails_by_label(
-            label_id=request.label_id, max_emails=request.max_emails
-        )
+        async with _report_progress(job, migration_service):
+            migration_result = await migration_service.migrate_emails_by_label(
+                label_id=request.label_id, max_emails=request.max_emails
+            )
 
         # Update final migration state
         await update_migration_state(
+            job,
             {
                 "status": "completed",
                 "processed_labels": 1,
@@ -356,26 +734,30 @@ async def migrate_emails_by_label(
                     f"Migration completed: {migration_result.get('successful', 0)} of "
                     f"{migration_result.get('total', 0)} emails migrated successfully"
                 ),
-            }
+            },
         )
 
         return migration_result
-    except HTTPException:
+    except HTTPException as e:
+        if e.status_code == status.HTTP_401_UNAUTHORIZED:
+            _evict_clients(request.credentials)
         raise
-    except Exception as e:
-        logger.exception("Migration error")
-        _raise_bad_request(f"Failed to migrate emails: {str(e)}")
+    except Exception as e:  # noqa: BLE001
+        _evict_clients(request.credentials)
+        _raise_bad_request(f"Failed to migrate emails: {str(e)}", e)
 
 
 @router.post("/gmail-to-outlook/all", response_model=dict)
 async def migrate_all_emails(
     request: FullMigrationRequest,
+    response: Response,
 ) -> dict:
     """
     Migrate all emails from Gmail to Outlook.
 
     Args:
         request: The migration request containing credentials and options.
+        response: The outgoing response, used to report the job ID.
 
     Returns:
         A dictionary with migration statistics.
@@ -384,34 +766,22 @@ async def migrate_all_emails(
         # Validate credentials
         _validate_credentials(request.credentials)
 
-        # Extract credentials and options
-        gmail_creds = request.credentials.gmail
-        outlook_creds = request.credentials.destination
+        # Extract options
         max_emails = request.max_emails_per_label
 
         # Create clients
-        gmail_client = GmailClient(
-            credentials={
-                "token": gmail_creds.token,
-                "refresh_token": gmail_creds.refresh_token,
-                "client_id": gmail_creds.client_id,
-                "client_secret": gmail_creds.client_secret,
-                "token_uri": gmail_creds.token_uri,
-            }
-        )
-
-        outlook_client = OutlookClient(access_token=outlook_creds.token)
+        gmail_client, outlook_client = await _get_clients(request.credentials)
 
         # Migrate emails
-        migration_service = GmailToOutlookMigrationService(
-            gmail_client=gmail_client, outlook_client=outlook_client
-        )
+        migration_service = _get_migration_service(gmail_client, outlook_client)
 
-        # Set the update status callback
-        migration_service.update_status_callback = update_migration_state
+        # Report progress to the requested job
+        job = get_migration_job(request.job_id)
+        response.headers["X-Migration-Job-Id"] = job.job_id
 
         # Update initial migration state
         await update_migration_state(
+            job,
             {
                 "status": "running",
                 "total_emails": 0,
@@ -422,29 +792,33 @@ async def migrate_all_emails(
                 "total_labels": 0,
                 "processed_labels": 0,
                 "logs": "Starting migration process...",
-            }
+            },
         )
 
-        migration_result = await migration_service.migrate_all_emails(
-            max_emails_per_label=max_emails
-        )
+        async with _report_progress(job, migration_service):
+            migration_result = await migration_service.migrate_all_emails(
+                max_emails_per_label=max_emails
+            )
 
         # Update final migration state
         await update_migration_state(
+            job,
             {
                 "status": "completed",
                 "logs": (
                     f"Migration completed: {migration_result.get('successful', 0)} of "
                     f"{migration_result.get('total', 0)} emails migrated successfully"
                 ),
-            }
+            },
         )
 
         return migration_result
 
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except HTTPException as e:
+        # Drop pooled clients whose credentials were rejected
+        if e.status_code == status.HTTP_401_UNAUTHORIZED:
+            _evict_clients(request.credentials)
         raise
-    except Exception as e:
-        logger.exception("Migration error")
-        _raise_bad_request(f"Failed to migrate emails: {str(e)}")
+    except Exception as e:  # noqa: BLE001
+        _evict_clients(request.credentials)
+        _raise_bad_request(f"Failed to migrate emails: {str(e)}", e)
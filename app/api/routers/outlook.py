@@ -1,31 +1,76 @@
 """Router for Outlook-related API endpoints."""
 
+import asyncio
 import base64
+import functools
 import logging
+import secrets
+from collections.abc import Iterator
 from typing import Annotated, Any
-from urllib.parse import quote
+from urllib.parse import urlencode
 
-import jwt
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse, RedirectResponse
-from pydantic import BaseModel
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from pydantic import BaseModel, ConfigDict
 
-from app.dependencies import get_gmail_client, get_outlook_client
-from app.services.gmail.client import GmailClient
-from app.services.outlook.auth import OutlookAuthManager
+from app.config import settings
+from app.dependencies import BEARER_PATTERN, get_gmail_client, get_outlook_client
+from app.services.gmail.client import BATCH_SIZE, GmailClient
+from app.services.outlook.auth import OutlookAuthConfig, OutlookAuthManager
 from app.services.outlook.auth import oauth_flow as outlook_oauth_flow
 from app.services.outlook.client import OutlookClient
+from app.utils.cache import TTLCache, hash_key
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Create router
-router = APIRouter(prefix="/outlook", tags=["outlook"])
+router = APIRouter(
+    prefix="/outlook", tags=["outlook"], default_response_class=ORJSONResponse
+)
+
+# Emails migrated at the same time by batch_migrate. Each one occupies a worker
+# thread while it waits on the Gmail and Graph APIs, and too many at once run
+# into Graph's throttling
+BATCH_MIGRATE_CONCURRENCY = settings.MIGRATE_CONCURRENCY
+
+# Auth managers for client-supplied OAuth configs. Each one holds an MSAL
+# application, which is costly to set up, so it is reused across requests
+AUTH_MANAGER_CACHE_TTL = 24 * 60 * 60
+_auth_managers: TTLCache[OutlookAuthManager] = TTLCache(
+    maxsize=32, ttl=AUTH_MANAGER_CACHE_TTL
+)
+
+# Access token claims holding the user's email, in order of preference
+TOKEN_EMAIL_CLAIMS = ("email", "upn", "unique_name")
+
+# Graph profile fields holding the user's email, in order of preference.
+# List fields contribute their first entry
+PROFILE_EMAIL_FIELDS = ("mail", "userPrincipalName", "otherMails")
+
+# User emails looked up from the Graph profile, keyed by access token
+PROFILE_CACHE_TTL = 5 * 60
+_profile_emails: TTLCache[str] = TTLCache(maxsize=1024, ttl=PROFILE_CACHE_TTL)
+
+# Tokens from completed OAuth callbacks, waiting to be collected by the page
+# the callback redirected to. Each one-time code is only valid briefly
+LOGIN_CODE_TTL = 2 * 60
+_pending_logins: TTLCache[dict[str, Any]] = TTLCache(maxsize=4096, ttl=LOGIN_CODE_TTL)
+
+# Decoded access token payloads. A token's claims never change, and Microsoft
+# access tokens live for about an hour, so entries are kept for as long
+TOKEN_PAYLOAD_CACHE_TTL = 60 * 60
+_token_payloads: TTLCache[dict[str, Any]] = TTLCache(
+    maxsize=1024, ttl=TOKEN_PAYLOAD_CACHE_TTL
+)
 
 
 class FolderResponse(BaseModel):
     """Response model for folder data."""
 
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     display_name: str
     parent_folder_id: str | None = None
@@ -33,15 +78,12 @@ class FolderResponse(BaseModel):
     total_item_count: int = 0
     unread_item_count: int = 0
 
-    class Config:
-        """Pydantic model configuration."""
-
-        from_attributes = True
-
 
 class MessageResponse(BaseModel):
     """Response model for message data."""
 
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     subject: str
     body_preview: str
@@ -50,11 +92,6 @@ class MessageResponse(BaseModel):
     received_date: str | None = None
     has_attachments: bool = False
 
-    class Config:
-        """Pydantic model configuration."""
-
-        from_attributes = True
-
 
 class EmailSchema(BaseModel):
     """Schema for email representation."""
@@ -98,6 +135,20 @@ class AuthCodeRequest(BaseModel):
     code: str
 
 
+class LoginCodeRequest(BaseModel):
+    """Request model for collecting the tokens of a completed OAuth callback."""
+
+    login_code: str
+
+
+class OutlookLoginResponse(BaseModel):
+    """Response model for the tokens of a completed OAuth callback."""
+
+    access_token: str
+    refresh_token: str | None = None
+    email: str
+
+
 def _handle_oauth_error(error_msg: str) -> RedirectResponse:
     """
     Handle OAuth error by redirecting to the main page with error message.
@@ -108,8 +159,106 @@ def _handle_oauth_error(error_msg: str) -> RedirectResponse:
     Returns:
         RedirectResponse: Redirect to the main page with error parameter
     """
-    logger.error(f"OAuth error: {error_msg}")
-    return RedirectResponse(url=f"/?error=outlook_auth_failed&message={error_msg}")
+    logger.error("OAuth error: %s", error_msg)
+    return RedirectResponse(
+        url="/?" + urlencode({"error": "outlook_auth_failed", "message": error_msg})
+    )
+
+
+def _get_auth_manager(config: OAuthConfig) -> OutlookAuthManager:
+    """
+    Get the auth manager for a client-supplied OAuth configuration.
+
+    Args:
+        config: OAuth client configuration
+
+    Returns:
+        OutlookAuthManager: Auth manager for the configuration
+    """
+    key = hash_key(config.client_id, config.client_secret, config.redirect_uri)
+    auth_manager = _auth_managers.get(key)
+    if auth_manager is None:
+        auth_manager = OutlookAuthManager(
+            OutlookAuthConfig(
+                client_id=config.client_id,
+                client_secret=config.client_secret,
+                redirect_uri=config.redirect_uri,
+            )
+        )
+        _auth_managers.set(key, auth_manager)
+    return auth_manager
+
+
+@functools.cache
+def _default_auth_url() -> str:
+    """
+    Build the authorization URL of the default OAuth configuration.
+
+    The URL only depends on the configured client ID, redirect URI and
+    scopes, so it is built once per process. Call
+    _default_auth_url.cache_clear() if the Outlook settings change at runtime.
+
+    Returns:
+        The authorization URL for the default auth manager
+    """
+    return outlook_oauth_flow.get_authorization_url()
+
+
+async def _resolve_auth_manager(config: OAuthConfig | None) -> OutlookAuthManager:
+    """
+    Get the auth manager for a request's optional OAuth configuration.
+
+    Creating an auth manager fetches the authority's metadata, so uncached
+    managers are built in a worker thread.
+
+    Args:
+        config: Optional OAuth client configuration
+
+    Returns:
+        OutlookAuthManager: Auth manager for the configuration, or the default
+    """
+    if config is None:
+        return outlook_oauth_flow
+    return await asyncio.to_thread(_get_auth_manager, config)
+
+
+def _decode_token_payload(access_token: str) -> dict[str, Any] | None:
+    """
+    Decode the claims of a JWT access token without verifying it.
+
+    Decoded payloads are cached, so repeated callbacks and retries with the
+    same token skip the base64 and JSON work.
+
+    Args:
+        access_token: The JWT access token
+
+    Returns:
+        The token claims, or None if the token is not a JWT
+    """
+    key = hash_key(access_token)
+    token_data = _token_payloads.get(key)
+    if token_data is not None:
+        return token_data
+
+    # JWT tokens are in the format header.payload.signature
+    # We only need the payload part
+    token_parts = access_token.split(".")
+    if len(token_parts) < 2:
+        return None
+
+    # Add padding if needed. JWTs strip it, and -n & 3 is the number of
+    # characters missing to reach a multiple of four
+    payload = token_parts[1]
+    padding = -len(payload) & 3
+    if padding:
+        payload += "==="[:padding]
+
+    # The payload is URL-safe base64 encoded JSON. The signature is not
+    # checked, so the claims are only used to display the account name
+    token_data = orjson.loads(base64.urlsafe_b64decode(payload))
+
+    _token_payloads.set(key, token_data)
+    return token_data
 
 
 def _extract_email_from_token(token_info: dict[str, Any]) -> str:
@@ -125,32 +274,17 @@ def _extract_email_from_token(token_info: dict[str, Any]) -> str:
     user_email = "Microsoft Account"  # Default value
 
     try:
-        # JWT tokens are in the format header.payload.signature
-        # We only need the payload part
-        token_parts = token_info["access_token"].split(".")
-        if len(token_parts) >= 2:
-            # Add padding if needed
-            payload = token_parts[1]
-            payload += "=" * ((4 - len(payload) % 4) % 4)
-
-            # Decode the base64 payload
-            decoded_payload = base64.b64decode(payload)
-            token_data = jwt.decode(
-                decoded_payload, options={"verify_signature": False}
-            )
-
-            logger.info(f"Decoded token data: {token_data}")
-
-            # Try to extract email from token
-            if "email" in token_data:
-                user_email = token_data["email"]
-                logger.info(f"Found email in token: {user_email}")
-            elif "upn" in token_data:
-                user_email = token_data["upn"]
-                logger.info(f"Found UPN in token: {user_email}")
-            elif "unique_name" in token_data:
-                user_email = token_data["unique_name"]
-                logger.info(f"Found unique_name in token: {user_email}")
+        token_data = _decode_token_payload(token_info["access_token"])
+        if token_data is not None:
+            logger.debug("Decoded token data: %s", token_data)
+
+            # Try the claims that might contain the email, in order of preference
+            for claim in TOKEN_EMAIL_CLAIMS:
+                value = token_data.get(claim)
+                if value:
+                    user_email = value
+                    logger.info("Found %s in token: %s", claim, user_email)
+                    break
     except Exception:
         logger.exception("Could not decode token")
 
@@ -161,12 +295,20 @@ def _get_user_profile_email(token: str) -> str:
     """
     Get user email from Microsoft Graph API.
 
+    Emails are cached per token, so repeated callbacks with the same token
+    don't request the profile again.
+
     Args:
         token: The access token for the Microsoft Graph API
 
     Returns:
         str: The user's email or default value
     """
+    key = hash_key(token)
+    cached_email = _profile_emails.get(key)
+    if cached_email is not None:
+        return cached_email
+
     user_email = "Microsoft Account"  # Default value
 
     try:
@@ -174,28 +316,22 @@ def _get_user_profile_email(token: str) -> str:
         client = OutlookClient(token)
         # Get user profile information
         user_info = client.get_user_profile()
-        logger.info(f"User profile keys: {user_info.keys()}")
-
-        # Try different fields that might contain the email
-        if user_info.get("mail"):
-            user_email = user_info["mail"]
-            logger.info(f"Using mail field: {user_email}")
-        elif user_info.get("userPrincipalName"):
-            user_email = user_info["userPrincipalName"]
-            logger.info(f"Using userPrincipalName field: {user_email}")
-        elif user_info.get("otherMails") and len(user_info["otherMails"]) > 0:
-            user_email = user_info["otherMails"][0]
-            logger.info(f"Using otherMails field: {user_email}")
+        logger.debug("User profile keys: %s", list(user_info))
+
+        # Try the fields that might contain the email, in order of preference
+        for field in PROFILE_EMAIL_FIELDS:
+            value = user_info.get(field)
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if value:
+                user_email = value
+                logger.info("Using %s field: %s", field, user_email)
+                break
         else:
             logger.warning("No email field found in user profile")
-            # Try to extract from any field that might look like an email
-            for key, value in user_info.items():
-                if isinstance(value, str) and "@" in value:
-                    user_email = value
-                    logger.info(f"Found email-like value in {key}: {user_email}")
-                    break
 
-        logger.info(f"Final user email: {user_email}")
+        logger.info("Final user email: %s", user_email)
+        _profile_emails.set(key, user_email)
     except Exception:
         logger.exception("Could not get user profile")
 
@@ -216,18 +352,16 @@ async def get_auth_url(
         Dict with auth_url key
     """
     try:
-        # Get the OAuth flow instance
-        flow_instance = outlook_oauth_flow
-        if config:
-            flow_instance = OutlookAuthManager(
-                client_id=config.client_id,
-                client_secret=config.client_secret,
-                redirect_uri=config.redirect_uri,
-            )
+        if config is None:
+            # The default URL never changes, so reuse the one built before
+            auth_url = _default_auth_url()
+        else:
+            # Get the OAuth flow instance
+            flow_instance = await _resolve_auth_manager(config)
 
-        # Generate the authorization URL
-        auth_url = flow_instance.get_authorization_url()
-        logger.info(f"Generated authorization URL: {auth_url[:50]}...")
+            # Generate the authorization URL
+            auth_url = await asyncio.to_thread(flow_instance.get_authorization_url)
+        logger.info("Generated authorization URL: %s...", auth_url[:50])
 
         return {"auth_url": auth_url}
     except Exception as e:
@@ -267,49 +401,72 @@ async def auth_callback_get(
             logger.error("No authorization code provided")
             return RedirectResponse(url="/?error=outlook_auth_failed&message=no_code")
 
-        logger.info(f"Received authorization code: {code[:10]}...")
+        logger.info("Received authorization code: %s...", code[:10])
 
         # Get the OAuth flow instance
-        flow_instance = outlook_oauth_flow
-        if config:
-            flow_instance = OutlookAuthManager(
-                client_id=config.client_id,
-                client_secret=config.client_secret,
-                redirect_uri=config.redirect_uri,
-            )
+        flow_instance = await _resolve_auth_manager(config)
 
         # Exchange the authorization code for credentials
-        token_info = flow_instance.exchange_code(code)
-        logger.info(f"Received token info: {token_info.keys()}")
+        token_info = await asyncio.to_thread(flow_instance.exchange_code, code)
+        logger.info("Received token info: %s", token_info.keys())
 
         # Try to get user email from token or profile
         user_email = _extract_email_from_token(token_info)
 
         # If we couldn't get email from token, try to get it from profile
         if user_email == "Microsoft Account":
-            profile_email = _get_user_profile_email(token_info["access_token"])
+            profile_email = await asyncio.to_thread(
+                _get_user_profile_email, token_info["access_token"]
+            )
             if profile_email != "Microsoft Account":
                 user_email = profile_email
 
-        # URL encode the email to avoid issues with special characters
-        encoded_email = quote(user_email)
-        logger.info(f"Encoded email: {encoded_email}")
-
-        # Redirect to main page with success parameter
-        # We'll handle storing the token in localStorage via JavaScript
-        redirect_url = f"/?outlook_auth=success&token={token_info['access_token']}"
-
-        if "refresh_token" in token_info and token_info["refresh_token"]:
-            redirect_url += f"&refresh_token={token_info['refresh_token']}"
-
-        redirect_url += f"&email={encoded_email}"
+        # Keep the tokens server-side and redirect with a one-time code, so
+        # they never appear in the URL, browser history or proxy logs. The
+        # page swaps the code for the tokens via /outlook/token-exchange
+        login_code = secrets.token_urlsafe(16)
+        _pending_logins.set(
+            login_code,
+            {
+                "access_token": token_info["access_token"],
+                "refresh_token": token_info.get("refresh_token"),
+                "email": user_email,
+            },
+        )
 
-        logger.info(f"Redirecting to: {redirect_url}")
-        return RedirectResponse(url=redirect_url)
+        logger.info("Redirecting to main page for: %s", user_email)
+        return RedirectResponse(
+            url="/?" + urlencode({"outlook_auth": "success", "login_code": login_code})
+        )
     except Exception as e:
         logger.exception("Failed to exchange authorization code")
         # Redirect to main page with error parameter
-        return RedirectResponse(url=f"/?error=outlook_auth_failed&message={str(e)}")
+        return RedirectResponse(
+            url="/?" + urlencode({"error": "outlook_auth_failed", "message": str(e)})
+        )
+
+
+@router.post("/token-exchange", response_model=OutlookLoginResponse)
+async def token_exchange(login_request: LoginCodeRequest) -> dict[str, Any]:
+    """
+    Swap the one-time code from the OAuth callback redirect for its tokens.
+
+    Args:
+        login_request: One-time login code from the redirect URL
+
+    Returns:
+        The access token, refresh token and email of the signed-in account
+
+    Raises:
+        HTTPException: If the code is unknown, expired or already used
+    """
+    login = _pending_logins.pop(login_request.login_code)
+    if login is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired login code",
+        )
+    return login
 
 
 def _validate_auth_code(auth_code: str) -> None:
@@ -352,16 +509,10 @@ async def auth_callback(
         logger.info(f"Received authorization code: {auth_code[:10]}...")
 
         # Get the OAuth flow instance
-        flow_instance = outlook_oauth_flow
-        if config:
-            flow_instance = OutlookAuthManager(
-                client_id=config.client_id,
-                client_secret=config.client_secret,
-                redirect_uri=config.redirect_uri,
-            )
+        flow_instance = await _resolve_auth_manager(config)
 
         # Exchange the authorization code for credentials
-        return flow_instance.exchange_code(auth_code)
+        return await asyncio.to_thread(flow_instance.exchange_code, auth_code)
     except Exception as e:
         logger.exception("Failed to exchange authorization code")
         raise HTTPException(
@@ -370,36 +521,64 @@ async def auth_callback(
         ) from e
 
 
-@router.get("/folders", response_model=list[FolderResponse])
+def _folder_fields(folder: dict[str, Any]) -> dict[str, Any]:
+    """
+    Map a Microsoft Graph mail folder to the fields of FolderResponse.
+
+    Args:
+        folder: Mail folder resource from the Graph API
+
+    Returns:
+        Dict[str, Any]: Folder information keyed by FolderResponse field
+    """
+    return {
+        "id": folder.get("id", ""),
+        "display_name": folder.get("displayName", ""),
+        "parent_folder_id": folder.get("parentFolderId"),
+        "child_folder_count": folder.get("childFolderCount", 0),
+        "total_item_count": folder.get("totalItemCount", 0),
+        "unread_item_count": folder.get("unreadItemCount", 0),
+    }
+
+
+def _folder_response(folder: dict[str, Any]) -> FolderResponse:
+    """
+    Convert a Microsoft Graph mail folder to its response model.
+
+    Graph returns well-typed folder resources, so validation is skipped.
+
+    Args:
+        folder: Mail folder resource from the Graph API
+
+    Returns:
+        FolderResponse: Folder information
+    """
+    return FolderResponse.model_construct(**_folder_fields(folder))
+
+
+@router.get(
+    "/folders",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": list[FolderResponse]}},
+)
 async def list_folders(
     outlook_client: Annotated[OutlookClient, Depends(get_outlook_client)],
-) -> list[FolderResponse]:
+) -> ORJSONResponse:
     """
     List all mail folders for the authenticated user.
 
+    Mailboxes can have thousands of folders, so the folders are encoded
+    straight to JSON as plain dicts rather than through response models.
+
     Args:
         outlook_client: Outlook client instance
 
     Returns:
-        List[FolderResponse]: List of mail folders
+        ORJSONResponse: List of mail folders, shaped like FolderResponse
     """
     try:
-        folders_data = outlook_client.get_folders()
-        folders = []
-
-        for folder in folders_data:
-            folders.append(
-                FolderResponse(
-                    id=folder.get("id", ""),
-                    display_name=folder.get("displayName", ""),
-                    parent_folder_id=folder.get("parentFolderId"),
-                    child_folder_count=folder.get("childFolderCount", 0),
-                    total_item_count=folder.get("totalItemCount", 0),
-                    unread_item_count=folder.get("unreadItemCount", 0),
-                )
-            )
-
-        return folders
+        folders_data = await asyncio.to_thread(outlook_client.get_folders)
+        return ORJSONResponse([_folder_fields(folder) for folder in folders_data])
     except Exception as e:
         logger.exception("Error listing Outlook folders")
         raise HTTPException(
@@ -426,15 +605,10 @@ async def create_folder(
         FolderResponse: Created folder information
     """
     try:
-        folder = outlook_client.create_folder(name, parent_folder_id)
-        return FolderResponse(
-            id=folder.get("id", ""),
-            display_name=folder.get("displayName", ""),
-            parent_folder_id=folder.get("parentFolderId"),
-            child_folder_count=folder.get("childFolderCount", 0),
-            total_item_count=folder.get("totalItemCount", 0),
-            unread_item_count=folder.get("unreadItemCount", 0),
+        folder = await asyncio.to_thread(
+            outlook_client.create_folder, name, parent_folder_id
         )
+        return _folder_response(folder)
     except Exception as e:
         logger.exception("Error creating Outlook folder")
         raise HTTPException(
@@ -443,6 +617,74 @@ async def create_folder(
         ) from e
 
 
+def _iter_attachments(
+    gmail_client: GmailClient,
+    email_id: str,
+    gmail_attachments: list[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield the attachments of a Gmail email, fetching them as they are needed.
+
+    Attachments are fetched one batch request at a time and each one is
+    released once it has been handed out, so only a single batch is held in
+    memory instead of every attachment of the email.
+
+    Args:
+        gmail_client: Gmail client instance
+        email_id: ID of the Gmail email
+        gmail_attachments: Attachment metadata of the email
+
+    Yields:
+        Dict[str, Any]: Attachment name, content and content type
+    """
+    for start in range(0, len(gmail_attachments), BATCH_SIZE):
+        batch = gmail_attachments[start : start + BATCH_SIZE]
+        contents = gmail_client.batch_get_attachments(
+            email_id, [a["id"] for a in batch]
+        )
+        for attachment in batch:
+            yield {
+                "name": attachment.get("filename") or "attachment.dat",
+                "content": contents.pop(attachment["id"], b""),
+                "contentType": attachment.get("mimeType"),
+            }
+
+
+async def _copy_email_to_outlook(
+    email_id: str,
+    gmail_client: GmailClient,
+    outlook_client: OutlookClient,
+    folder_id: str | None,
+) -> dict[str, Any]:
+    """
+    Copy a Gmail email and its attachments to Outlook.
+
+    Both clients are synchronous, so their calls run in worker threads.
+
+    Args:
+        email_id: ID of the Gmail email to migrate
+        gmail_client: Gmail client instance
+        outlook_client: Outlook client instance
+        folder_id: Target Outlook folder ID
+
+    Returns:
+        Dict[str, Any]: Migrated message information
+    """
+    # Get the email from Gmail
+    gmail_email = await asyncio.to_thread(gmail_client.get_email_content, email_id)
+
+    # Migrate to Outlook. Attachments are fetched lazily while the Outlook
+    # client uploads them, in the same worker thread
+    return await asyncio.to_thread(
+        outlook_client.migrate_email,
+        gmail_message=gmail_email,
+        attachments=_iter_attachments(
+            gmail_client, email_id, gmail_email.get("attachments", [])
+        ),
+        folder_id=folder_id,
+    )
+
+
 @router.post("/migrate-email")
 async def migrate_email(
     email_id: str,
@@ -463,29 +705,8 @@ async def migrate_email(
         Dict[str, str]: Migration result
     """
     try:
-        # Get the email from Gmail
-        gmail_email = gmail_client.get_email(email_id)
-
-        # Get any attachments
-        attachments = []
-        if gmail_email.get("has_attachments", False):
-            for attachment in gmail_email.get("attachments", []):
-                attachment_data = gmail_client.get_attachment(
-                    email_id, attachment["id"]
-                )
-                attachments.append(
-                    {
-                        "name": attachment_data.get("filename", "attachment.dat"),
-                        "content": attachment_data.get("data", b""),
-                        "contentType": attachment_data.get("mime_type"),
-                    }
-                )
-
-        # Migrate to Outlook
-        migrated_email = outlook_client.migrate_email(
-            gmail_message=gmail_email,
-            attachments=attachments,
-            folder_id=folder_id,
+        migrated_email = await _copy_email_to_outlook(
+            email_id, gmail_client, outlook_client, folder_id
         )
 
         return {
@@ -513,6 +734,8 @@ async def batch_migrate(
     """
     Migrate multiple emails from Gmail to Outlook.
 
+    Up to BATCH_MIGRATE_CONCURRENCY emails are migrated at the same time.
+
     Args:
         email_ids: List of Gmail email IDs to migrate
         gmail_client: Gmail client instance
@@ -529,81 +752,70 @@ async def batch_migrate(
         "failed_ids": [],
     }
 
-    for email_id in email_ids:
-        try:
-            # Get the email from Gmail
-            gmail_email = gmail_client.get_email(email_id)
-
-            # Get any attachments
-            attachments = []
-            if gmail_email.get("has_attachments", False):
-                for attachment in gmail_email.get("attachments", []):
-                    attachment_data = gmail_client.get_attachment(
-                        email_id, attachment["id"]
-                    )
-                    attachments.append(
-                        {
-                            "name": attachment_data.get("filename", "attachment.dat"),
-                            "content": attachment_data.get("data", b""),
-                            "contentType": attachment_data.get("mime_type"),
-                        }
-                    )
-
-            # Migrate to Outlook
-            outlook_client.migrate_email(
-                gmail_message=gmail_email,
-                attachments=attachments,
-                folder_id=folder_id,
+    semaphore = asyncio.Semaphore(BATCH_MIGRATE_CONCURRENCY)
+
+    async def migrate(email_id: str) -> None:
+        async with semaphore:
+            await _copy_email_to_outlook(
+                email_id, gmail_client, outlook_client, folder_id
             )
 
-            results["successful"] += 1
+    outcomes = await asyncio.gather(
+        *(migrate(email_id) for email_id in email_ids), return_exceptions=True
+    )
 
-        except Exception:
-            logger.exception(f"Error migrating email {email_id}")
+    for email_id, outcome in zip(email_ids, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Error migrating email {email_id}", exc_info=outcome)
             results["failed"] += 1
             results["failed_ids"].append(email_id)
+        else:
+            results["successful"] += 1
 
     return results
 
 
 @router.get("/validate-token")
-async def validate_outlook_token(request: Request) -> JSONResponse:
+async def validate_outlook_token(
+    authorization: Annotated[str | None, Header()] = None,
+) -> ORJSONResponse:
     """
     Validates if the provided Outlook token is still valid.
 
     Args:
-        request: The FastAPI request object
+        authorization: Authorization header with the Outlook access token
 
     Returns:
-        JSONResponse: A JSON response indicating if the token is valid
+        ORJSONResponse: A JSON response indicating if the token is valid
     """
     try:
-        # Get the token from the session
-        token = request.session.get("outlook_token")
-        if not token:
-            return JSONResponse(
+        # Get the token from the Authorization header
+        match = BEARER_PATTERN.fullmatch(authorization or "")
+        if match is None:
+            return ORJSONResponse(
                 status_code=401,
                 content={
                     "valid": False,
-                    "message": "No Outlook token found in session",
+                    "message": "No Outlook token found in Authorization header",
                 },
             )
+        token = match.group(1)
 
         # Create an Outlook client with the token
-        outlook_client = OutlookClient(token=token)
+        outlook_client = OutlookClient(token)
 
         # Try to make a simple API call to validate the token
         # This will throw an exception if the token is invalid
-        outlook_client.list_mail_folders()
+        await asyncio.to_thread(outlook_client.get_folders)
 
         # If we get here, the token is valid
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={"valid": True, "message": "Outlook token is valid"},
         )
     except Exception as e:
         logger.exception("Outlook token validation error")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=401,
             content={"valid": False, "message": f"Outlook token is invalid: {str(e)}"},
         )
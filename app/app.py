@@ -1,22 +1,58 @@
 """Main application factory for the FastAPI app."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Self
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.testclient import TestClient
 
 from app.api.routers import gmail, migration, outlook
 from app.config import settings
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from app.utils.http_client import close_http_client
 
 logger = logging.getLogger(__name__)
 
+# Worker threads available to asyncio.to_thread. The Gmail and Outlook clients
+# are synchronous, so this bounds how many API calls can block at once
+THREAD_POOL_SIZE = 32
+
+# How long browsers may cache a CORS preflight response, in seconds
+CORS_MAX_AGE = 24 * 60 * 60
+
+# Methods and request headers used by the API, the only ones allowed from
+# other origins
+CORS_ALLOWED_METHODS = ("GET", "POST")
+CORS_ALLOWED_HEADERS = ("Authorization", "Content-Type", "X-Destination-Token")
+
+# Routers registered on the app, none of which include nested routers
+API_ROUTERS = (gmail.router, outlook.router, migration.router)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """
+    Manage resources shared across requests for the lifetime of the app.
+
+    Args:
+        _app: The FastAPI application
+
+    Yields:
+        Control to the running application
+    """
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=THREAD_POOL_SIZE, thread_name_prefix="api-client"
+        )
+    )
+    yield
+    await close_http_client()
+
 
 def create_app(testing: bool = False) -> FastAPI:
     """
@@ -34,45 +70,66 @@ def create_app(testing: bool = False) -> FastAPI:
         version="0.1.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
-    # Configure CORS
+    # Configure CORS. Only the configured origins may call the API from other
+    # sites. Credentials aren't allowed, as the API is authorized by bearer
+    # tokens rather than cookies
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],  # In production, restrict this to specific domains
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=False,
+        allow_methods=CORS_ALLOWED_METHODS,
+        allow_headers=CORS_ALLOWED_HEADERS,
+        max_age=CORS_MAX_AGE,
     )
 
     # Register API routers
-    app.include_router(gmail.router)
-    app.include_router(outlook.router)
-    app.include_router(migration.router)
+    for router in API_ROUTERS:
+        app.include_router(router)
 
     # For testing compatibility
     if testing:
-        # Add test_client method for pytest compatibility with Flask-style tests
-        app.test_client = lambda: app.test_client_class(app)
-
-        # Simple TestClient class for Flask-style tests
+        # Simple TestClient class for Flask-style tests. One client serves
+        # every request instead of a new client and lifespan per call
         class TestClientClass:
             def __init__(self, app: FastAPI) -> None:
                 self.app = app
+                self.client = TestClient(app)
 
             def __call__(self, _app: FastAPI) -> "TestClientClass":  # noqa: ARG002
                 return self
 
+            def __enter__(self) -> Self:
+                self.client.__enter__()
+                return self
+
+            def __exit__(self, *exc_info: object) -> None:
+                self.client.__exit__(*exc_info)
+
             # Ignoring return type and kwargs type annotation per project's ruff config
             def get(self, path: str, **kwargs):  # noqa: ANN003, ANN202
-                with TestClient(self.app) as client:
-                    return client.get(path, **kwargs)
+                return self.client.get(path, **kwargs)
 
         app.test_client_class = TestClientClass
 
+        # Add test_client method for pytest compatibility with Flask-style tests
+        test_client = TestClientClass(app)
+        app.test_client = lambda: test_client
+
     return app
 
 
 if __name__ == "__main__":
-    app = create_app()
-    app.run(debug=True)
+    import uvicorn
+
+    # Serve the full app from app.main, which also configures logging. The
+    # factory alone has no side effects
+    uvicorn.run(
+        "app.main:app",
+        host="127.0.0.1",
+        port=8000,
+        reload=settings.DEBUG,
+    )
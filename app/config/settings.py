@@ -1,12 +1,16 @@
 """Application settings and configuration."""
 
 import os
+import secrets
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file. Deployments that already pass the
+# variables in, such as docker-compose with env_file, set DOTENV_DISABLE=1 to
+# skip reading the file
+if os.getenv("DOTENV_DISABLE") != "1":
+    load_dotenv()
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -15,7 +19,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 GMAIL_CLIENT_ID: str = os.getenv("GMAIL_CLIENT_ID", "")
 GMAIL_CLIENT_SECRET: str = os.getenv("GMAIL_CLIENT_SECRET", "")
 GMAIL_REDIRECT_URI: str = os.getenv(
-    "GMAIL_REDIRECT_URI", "http://localhost:8000/auth/callback"
+    "GMAIL_REDIRECT_URI", "http://localhost:8000/gmail/auth-callback"
 )
 
 # Outlook API credentials
@@ -32,9 +36,27 @@ YAHOO_REDIRECT_URI: str = os.getenv(
     "YAHOO_REDIRECT_URI", "http://localhost:8000/auth/yahoo/callback"
 )
 
+# Origins allowed to call the API from another site, separated by commas. The
+# frontend is served by the app itself, so none are needed by default
+CORS_ORIGINS: list[str] = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+# Key used to sign session cookies. Without a configured key a random one is
+# generated, so sessions don't survive restarts or span multiple workers
+SECRET_KEY: str = os.getenv("SECRET_KEY") or secrets.token_urlsafe(32)
+
 # Application settings
 DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 MAX_EMAILS_PER_BATCH: int = int(os.getenv("MAX_EMAILS_PER_BATCH", "100"))
 # Requests per minute
 RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "60"))
+# Gmail API quota units per user per minute, kept just below Google's 15,000
+GMAIL_QUOTA_UNITS_PER_MINUTE: int = int(
+    os.getenv("GMAIL_QUOTA_UNITS_PER_MINUTE", "14000")
+)
+# Emails migrated at the same time by a batch migration request
+MIGRATE_CONCURRENCY: int = int(os.getenv("MIGRATE_CONCURRENCY", "16"))
@@ -1,35 +1,50 @@
 """FastAPI dependencies for the application."""
 
+import asyncio
 import logging
-import os
+import re
 from typing import Annotated
 
-from fastapi import Header, HTTPException, status
+import httpx
+from fastapi import Depends, Header, HTTPException, status
 
+from app.config import settings
+from app.services.gmail.auth import get_cached_credentials
 from app.services.gmail.client import GmailClient
 from app.services.outlook.client import OutlookClient
+from app.utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Syntax of a bearer token (RFC 6750). Google access tokens are opaque rather
+# than JWTs, so only the characters are checked, not the token structure
+ACCESS_TOKEN_SYNTAX = r"[A-Za-z0-9\-._~+/]+=*"
+
+# Authorization header carrying a Gmail access token, and the bare Outlook
+# token. Malformed values are rejected before any client is built
+BEARER_PATTERN = re.compile(rf"Bearer ({ACCESS_TOKEN_SYNTAX})")
+ACCESS_TOKEN_PATTERN = re.compile(ACCESS_TOKEN_SYNTAX)
+
 
 def get_gmail_redirect_uri() -> str:
     """
-    Get the configured Gmail redirect URI from environment variables or use a default.
+    Get the configured Gmail redirect URI.
 
     Returns:
         str: The redirect URI for Gmail OAuth
     """
-    # Get the redirect URI from environment variables or use default
-    return os.getenv("GMAIL_REDIRECT_URI", "http://localhost:8000/gmail/auth-callback")
+    return settings.GMAIL_REDIRECT_URI
 
 
 async def get_gmail_client(
+    http_client: Annotated[httpx.AsyncClient, Depends(get_http_client)],
     authorization: Annotated[str | None, Header()] = None,
 ) -> GmailClient:
     """
     Dependency to get an authenticated Gmail client.
 
     Args:
+        http_client: HTTP client used to refresh cached credentials
         authorization: Authorization header with OAuth token
 
     Returns:
@@ -38,7 +53,8 @@ async def get_gmail_client(
     Raises:
         HTTPException: If unauthorized or token is invalid
     """
-    if not authorization or not authorization.startswith("Bearer "):
+    match = BEARER_PATTERN.fullmatch(authorization or "")
+    if match is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authorization header with Bearer token is required",
@@ -46,19 +62,18 @@ async def get_gmail_client(
         )
 
     # Extract token
-    token = authorization.replace("Bearer ", "")
+    token = match.group(1)
 
-    # In a real app, you would validate the token and retrieve stored credentials
-    # For now, we'll create a client with minimal validation
     try:
-        # Here you would get the full credentials associated with this token
-        # This is a simplified version
-        credentials = {
+        # Use the full credentials stored at sign-in when we have them, so the
+        # client can refresh the token; otherwise fall back to the bare token
+        credentials = await get_cached_credentials(token, http_client) or {
             "token": token,
-            # Other credential fields would be retrieved from storage
         }
 
-        return GmailClient(credentials)
+        # Building the Gmail service parses the discovery document and may
+        # refresh the token, so it runs in a worker thread
+        return await asyncio.to_thread(GmailClient, credentials)
     except Exception as e:
         logger.exception("Error creating Gmail client")
         raise HTTPException(
@@ -83,7 +98,9 @@ async def get_outlook_client(
     Raises:
         HTTPException: If unauthorized or token is invalid
     """
-    if not x_destination_token:
+    if not x_destination_token or not ACCESS_TOKEN_PATTERN.fullmatch(
+        x_destination_token
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="X-Destination-Token header is required",
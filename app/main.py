@@ -2,38 +2,66 @@
 
 import logging
 import sys
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+import orjson
 import uvicorn
 from fastapi import Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 
 from app.app import create_app
 from app.config import settings
-
-# Set up logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("app.log"),
-    ],
+from app.utils.cache import TTLCache, hash_key
+from app.utils.log_queue import configure_logging, log_level
+from app.utils.static_files import VersionedStaticFiles
+
+# Size at which the log file is rotated, and the number of old files kept
+LOG_FILE_MAX_BYTES = 50 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+# Set up logging. Records are written to stdout and the log file by a
+# background thread
+configure_logging(
+    log_level(settings.LOG_LEVEL),
+    logging.StreamHandler(sys.stdout),
+    RotatingFileHandler(
+        "app.log", maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
+    ),
 )
 logger = logging.getLogger(__name__)
 
+# uvicorn logs a line per request. Outside debug mode those lines are dropped
+# however the server is started, including by the Dockerfile's uvicorn command
+logging.getLogger("uvicorn.access").setLevel(
+    logging.INFO if settings.DEBUG else logging.WARNING
+)
+
 # Create FastAPI app
 app = create_app()
 
-# Set up templates
+# Set up templates. Outside debug mode templates don't change while the app
+# runs, so they aren't checked for changes on every render, and the home page
+# is compiled now rather than on the first request
 templates_path = Path(__file__).parent / "templates"
 templates = Jinja2Templates(directory=str(templates_path))
+templates.env.auto_reload = settings.DEBUG
+index_template = templates.get_template("index.html")
 
-# Mount static files
+# Mount static files. Templates link them with the content version, so
+# browsers can cache them until the next deployment changes a file. In debug
+# mode files are edited in place, so the links are left unversioned
 static_path = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+static_files = VersionedStaticFiles(static_path)
+app.mount("/static", static_files, name="static")
+templates.env.globals["static_version"] = "" if settings.DEBUG else static_files.version
+
+# Rendered home pages. The page only depends on the request through the
+# static URLs, which are built from its base URL, so it is rendered once per
+# base URL. Hosts come from the client, so only a few pages are kept
+INDEX_PAGE_CACHE_TTL = 24 * 60 * 60
+_index_pages: TTLCache[bytes] = TTLCache(maxsize=16, ttl=INDEX_PAGE_CACHE_TTL)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -41,39 +69,53 @@ async def root(request: Request) -> HTMLResponse:
     """
     Home page route.
 
+    The page is rendered from the compiled template and reused for later
+    requests to the same base URL. In debug mode it is rendered every time,
+    so template edits show up straight away.
+
     Args:
         request: The incoming request
 
     Returns:
         HTML response with the home page
     """
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "title": "Gmail Migrator",
-            "gmail_client_id": settings.GMAIL_CLIENT_ID,
-        },
-    )
+    key = hash_key(str(request.base_url))
+    page = None if settings.DEBUG else _index_pages.get(key)
+    if page is None:
+        page = index_template.render(
+            request=request,
+            title="Gmail Migrator",
+            gmail_client_id=settings.GMAIL_CLIENT_ID,
+        ).encode("utf-8")
+        _index_pages.set(key, page)
+    return HTMLResponse(page)
+
+
+# Body of every health check response, encoded once
+HEALTH_BODY = orjson.dumps({"status": "healthy"})
 
 
 @app.get("/health")
-async def health() -> dict[str, str]:
+async def health() -> Response:
     """
     Health check endpoint.
 
+    Probes hit this often, so the prebuilt body is sent without serialization.
+    A new response is built per request because middleware may add headers.
+
     Returns:
-        Dictionary with service status
+        JSON response with service status
     """
-    return {"status": "healthy"}
+    return Response(HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
-    # For local development only, use 127.0.0.1 instead of 0.0.0.0 for security
+    # For local development only, use 127.0.0.1 instead of 0.0.0.0 for security.
+    # Access logging is skipped entirely unless debugging
     uvicorn.run(
         "app.main:app",
         host="127.0.0.1",
         port=8000,
         reload=settings.DEBUG,
-        access_log=True,
+        access_log=settings.DEBUG,
     )
@@ -1,17 +1,36 @@
 """Gmail OAuth authentication flow."""
 
 import logging
-import os
 import secrets
+import time
 from typing import Any, NoReturn
 from urllib.parse import urlencode
 
+import httpx
 import requests
 from fastapi import HTTPException, status
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
 
 from app.config import settings
+from app.utils.cache import TTLCache, hash_key
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Google access tokens live for an hour; credentials that can't be refreshed
+# are dropped a little earlier so a token about to expire is never handed out
+TOKEN_CACHE_TTL = 55 * 60
+# Refresh access tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 60
+# Credentials that carry a refresh token outlive their access token, so the
+# refresh window before each expiry is reached
+REFRESHABLE_TOKEN_CACHE_TTL = 24 * 60 * 60
+
+# Full OAuth credentials keyed by the access token the frontend sends, so API
+# clients can refresh tokens instead of sending the user back through OAuth
+token_cache: TTLCache[dict[str, Any]] = TTLCache(maxsize=1024, ttl=TOKEN_CACHE_TTL)
 
 
 class OAuthFlow:
@@ -86,8 +105,6 @@ class OAuthFlow:
     def exchange_code(self, code: str) -> dict[str, str]:
         """Exchange an authorization code for access and refresh tokens."""
         try:
-            # Add logging for debugging
-            logger = logging.getLogger(__name__)
             logger.debug(f"Starting exchange_code with client_id: {self.client_id}")
             logger.debug(f"Redirect URI: {self.redirect_uri}")
 
@@ -162,8 +179,6 @@ class OAuthFlow:
             dict: OAuth credentials for Gmail API access
         """
         try:
-            # Add debug logging
-            logger = logging.getLogger(__name__)
             logger.debug(
                 f"Starting exchange_google_credential with client_id: {self.client_id}"
             )
@@ -226,14 +241,12 @@ class OAuthFlow:
             }
 
         except ValueError as e:
-            logger = logging.getLogger(__name__)
             logger.exception("ValueError in exchange_google_credential")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Invalid Google credential: {str(e)}",
             ) from e
         except Exception as e:
-            logger = logging.getLogger(__name__)
             logger.error(
                 f"Exception in exchange_google_credential: {str(e)}", exc_info=True
             )
@@ -260,13 +273,12 @@ async def exchange_code(code: str, redirect_uri: str) -> dict[str, Any]:
     Returns:
         dict: The token response data
     """
-    logger = logging.getLogger(__name__)
     logger.debug("Starting async exchange_code")
 
     try:
-        # Get credentials from environment
-        client_id = os.getenv("GMAIL_CLIENT_ID")
-        client_secret = os.getenv("GMAIL_CLIENT_SECRET")
+        # Get credentials from the settings
+        client_id = settings.GMAIL_CLIENT_ID
+        client_secret = settings.GMAIL_CLIENT_SECRET
 
         if not all([client_id, client_secret, redirect_uri]):
             logger.error("Missing OAuth configuration")
@@ -327,3 +339,114 @@ async def exchange_code(code: str, redirect_uri: str) -> dict[str, Any]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error exchanging authorization code: {str(e)}",
         ) from e
+
+
+def cache_token_response(token_response: dict[str, Any]) -> None:
+    """
+    Remember the credentials from a token response for later API calls.
+
+    Args:
+        token_response: Token data returned by Google's token endpoint
+    """
+    access_token = token_response.get("access_token")
+    if not access_token:
+        return
+
+    expires_in = int(token_response.get("expires_in", TOKEN_CACHE_TTL))
+    credentials = {
+        "token": access_token,
+        "refresh_token": token_response.get("refresh_token", ""),
+        "token_uri": GOOGLE_TOKEN_URI,
+        "expires_at": time.time() + expires_in,
+    }
+    if token_response.get("scope"):
+        credentials["scopes"] = token_response["scope"].split()
+
+    _store_credentials(hash_key(access_token), credentials)
+
+
+def _store_credentials(key: str, credentials: dict[str, Any]) -> None:
+    """
+    Store credentials in the token cache.
+
+    Credentials without a refresh token are useless once the access token
+    expires, so only refreshable ones are kept past TOKEN_CACHE_TTL.
+
+    Args:
+        key: Cache key derived from the access token the frontend sends
+        credentials: Credentials to store
+    """
+    ttl = REFRESHABLE_TOKEN_CACHE_TTL if credentials.get("refresh_token") else None
+    token_cache.set(key, credentials, ttl=ttl)
+
+
+async def refresh_access_token(
+    refresh_token: str, http_client: httpx.AsyncClient
+) -> dict[str, Any]:
+    """
+    Get a new access token using a refresh token.
+
+    Args:
+        refresh_token: OAuth refresh token
+        http_client: HTTP client used to call the token endpoint
+
+    Returns:
+        dict: The token response data
+
+    Raises:
+        httpx.HTTPStatusError: If Google rejects the refresh request
+    """
+    response = await http_client.post(
+        GOOGLE_TOKEN_URI,
+        data={
+            "client_id": settings.GMAIL_CLIENT_ID,
+            "client_secret": settings.GMAIL_CLIENT_SECRET,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_cached_credentials(
+    access_token: str, http_client: httpx.AsyncClient
+) -> dict[str, Any] | None:
+    """
+    Look up the stored credentials for an access token.
+
+    Tokens that are about to expire are refreshed proactively, and the
+    refreshed credentials are stored under the same access token.
+
+    Args:
+        access_token: Access token sent by the frontend
+        http_client: HTTP client used to refresh the token
+
+    Returns:
+        dict: Stored credentials, or None if the token is unknown
+    """
+    key = hash_key(access_token)
+    credentials = token_cache.get(key)
+    if credentials is None:
+        return None
+
+    expires_in = credentials.get("expires_at", 0) - time.time()
+    if credentials.get("refresh_token") and expires_in < TOKEN_REFRESH_MARGIN:
+        try:
+            token_data = await refresh_access_token(
+                credentials["refresh_token"], http_client
+            )
+        except httpx.HTTPError:
+            logger.exception("Failed to refresh Gmail access token")
+            return credentials
+
+        credentials = {
+            **credentials,
+            "token": token_data["access_token"],
+            "expires_at": time.time()
+            + int(token_data.get("expires_in", TOKEN_CACHE_TTL)),
+        }
+        _store_credentials(key, credentials)
+        logger.debug("Refreshed Gmail access token")
+
+    return credentials
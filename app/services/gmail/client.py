@@ -1,19 +1,27 @@
 """Gmail API client for authentication and fetching emails."""
 
 import base64
+import functools
 import logging
-import os
+import threading
 import time
 from collections.abc import Generator
+from http import HTTPStatus
 from typing import Any
 
 import google.oauth2.credentials
 import google_auth_httplib2
+import httplib2
+from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, HttpRequest, build_http
 
 from app.config import settings
+from app.utils.cache import TTLCache, hash_key
+from app.utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +37,115 @@ GMAIL_SCOPES = [
 NO_CREDENTIALS_ERROR = "No credentials available. Please authenticate first."
 
 # Rate limiting parameters
-MAX_REQUESTS_PER_MINUTE = settings.RATE_LIMIT_REQUESTS
-REQUEST_INTERVAL = 60.0 / MAX_REQUESTS_PER_MINUTE  # seconds between requests
+QUOTA_UNITS_PER_MINUTE = settings.GMAIL_QUOTA_UNITS_PER_MINUTE
+# Quota units charged by Gmail for each of the message/attachment calls we make
+REQUEST_QUOTA_UNITS = 5
+# Maximum number of message fetches sent in one batch request. Gmail accepts up
+# to 100, but recommends at most 50 to avoid tripping its rate limits
+BATCH_SIZE = 50
+
+# Partial response mask for email listings: headers, snippet and enough of the
+# MIME tree to spot attachments, without any of the message bodies. Masks
+# can't select parts recursively, so each level of the tree is spelled out.
+# Forwarded messages and mixed/related/alternative trees put attachments
+# several levels down
+_ATTACHMENT_PART_FIELDS = "filename,mimeType,body/attachmentId"
+SUMMARY_PART_DEPTH = 8
+
+
+def _parts_mask(depth: int) -> str:
+    """Build a partial response mask selecting attachment fields of nested parts."""
+    if depth == 1:
+        return f"parts({_ATTACHMENT_PART_FIELDS})"
+    return f"parts({_ATTACHMENT_PART_FIELDS},{_parts_mask(depth - 1)})"
+
+
+EMAIL_SUMMARY_FIELDS = (
+    "id,threadId,labelIds,snippet,"
+    f"payload(mimeType,headers,{_parts_mask(SUMMARY_PART_DEPTH)})"
+)
+
+# Gmail quota is enforced per user, so every client for the same mailbox draws
+# from one shared bucket regardless of which request created it or which
+# access token it holds
+_quota_buckets: TTLCache[TokenBucket] = TTLCache(maxsize=1024, ttl=60 * 60)
+_quota_buckets_lock = threading.Lock()
+
+# Mailbox addresses keyed by access token. Each token is looked up once, so a
+# refreshed token finds the bucket and cached messages of its mailbox instead
+# of starting afresh.
+# Access tokens live for an hour, so entries are kept for as long
+MAILBOX_CACHE_TTL = 60 * 60
+_token_mailboxes: TTLCache[str] = TTLCache(maxsize=1024, ttl=MAILBOX_CACHE_TTL)
+
+# HTTP connections to the Gmail API, one per worker thread. Clients are built
+# per request, so sharing them keeps connections alive across requests
+_thread_https = threading.local()
+
+
+def _get_quota_bucket(mailbox: str) -> TokenBucket:
+    """
+    Get the shared quota bucket of a mailbox.
+
+    Args:
+        mailbox: Identifier of the mailbox, usually its email address
+
+    Returns:
+        Token bucket tracking the mailbox's Gmail API quota
+    """
+    key = hash_key(mailbox)
+    with _quota_buckets_lock:
+        bucket = _quota_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(QUOTA_UNITS_PER_MINUTE)
+        # Refresh the TTL so active mailboxes keep their bucket state
+        _quota_buckets.set(key, bucket)
+        return bucket
+
+
+def _shared_http() -> httplib2.Http:
+    """
+    Get the Gmail API connection shared by all clients on the current thread.
+
+    httplib2 connections are not thread-safe, but clients on the same thread
+    can take turns using one. Each client adds its own credentials on top.
+
+    Returns:
+        The thread's HTTP connection
+    """
+    http = getattr(_thread_https, "http", None)
+    if http is None:
+        http = build_http()
+        _thread_https.http = http
+    return http
+
+
+@functools.cache
+def _gmail_discovery_document() -> str:
+    """
+    Load the Gmail API discovery document bundled with googleapiclient.
+
+    The document is read once per process. It is kept as a string rather than
+    a parsed dict because googleapiclient mutates the parsed document while
+    building methods, so every service needs its own copy.
+
+    Returns:
+        The Gmail v1 discovery document as JSON
+    """
+    return get_static_doc("gmail", "v1")
+
+
+def _fields_param(fields: str | None) -> dict[str, str]:
+    """
+    Build the keyword arguments requesting a partial response.
+
+    Args:
+        fields: Partial response mask, or None for the full resource
+
+    Returns:
+        Keyword arguments to pass to a Gmail API method
+    """
+    return {"fields": fields} if fields else {}
 
 
 class GmailClient:
@@ -50,8 +165,10 @@ class GmailClient:
         self.credentials_path = credentials_path or "credentials.json"
         self.service = None
         self.request_count = 0
-        self.requests_per_minute = settings.RATE_LIMIT_REQUESTS
-        self._last_request_time = 0
+        # Google credentials backing the service, used to authorize the
+        # per-thread HTTP connections created by _execute
+        self._google_credentials: google.oauth2.credentials.Credentials | None = None
+        self._thread_local = threading.local()
 
         # Build the service if credentials are provided
         if self.credentials and "token" in self.credentials:
@@ -113,9 +230,9 @@ class GmailClient:
         token_uri = self.credentials.get(
             "token_uri", "https://oauth2.googleapis.com/token"
         )
-        client_id = self.credentials.get("client_id", os.getenv("GMAIL_CLIENT_ID", ""))
+        client_id = self.credentials.get("client_id", settings.GMAIL_CLIENT_ID)
         client_secret = self.credentials.get(
-            "client_secret", os.getenv("GMAIL_CLIENT_SECRET", "")
+            "client_secret", settings.GMAIL_CLIENT_SECRET
         )
         scopes = self.credentials.get("scopes", GMAIL_SCOPES)
 
@@ -146,10 +263,6 @@ class GmailClient:
                     "Please re-authenticate."
                 )
 
-                # For API calls that don't require a refresh token
-                from google.auth.transport.requests import Request
-                from googleapiclient.http import build_http
-
                 credentials = google.oauth2.credentials.Credentials(
                     token=token, scopes=scopes
                 )
@@ -157,7 +270,10 @@ class GmailClient:
                 # Create the service directly without refresh capability
                 http = build_http()
                 http = google_auth_httplib2.AuthorizedHttp(credentials, http=http)
-                self.service = build("gmail", "v1", http=http)
+                self.service = build_from_document(
+                    _gmail_discovery_document(), http=http
+                )
+                self._google_credentials = credentials
                 logger.info(
                     "Gmail service built successfully with non-refreshable credentials"
                 )
@@ -183,7 +299,10 @@ class GmailClient:
                     self.credentials["token"] = credentials.token
                     logger.info("Token refreshed successfully")
 
-                self.service = build("gmail", "v1", credentials=credentials)
+                self.service = build_from_document(
+                    _gmail_discovery_document(), credentials=credentials
+                )
+                self._google_credentials = credentials
                 logger.info(
                     "Gmail service built successfully with refreshable credentials"
                 )
@@ -195,23 +314,120 @@ class GmailClient:
                 )
             raise
 
-    def _rate_limit_request(self) -> None:
+    def _rate_limit_request(self, quota_units: int = REQUEST_QUOTA_UNITS) -> None:
         """
         Implement rate limiting to avoid hitting Gmail API limits.
 
-        This ensures we wait a minimum amount of time between requests.
+        Requests draw from a token bucket sized to the per-user quota, so
+        bursts go through immediately and only sustained overuse has to wait.
+
+        Args:
+            quota_units: Quota units the upcoming request costs
+        """
+        _get_quota_bucket(self.mailbox()).acquire(quota_units)
+
+    def cached_mailbox(self) -> str | None:
+        """
+        Get the mailbox of the client's access token if it is already known.
+
+        Unlike mailbox, this never makes a request, so it can be called from
+        the event loop.
+
+        Returns:
+            The mailbox's email address, or None if it hasn't been looked up
+        """
+        token = (self.credentials or {}).get("token") or ""
+        return _token_mailboxes.get(hash_key(token)) if token else None
+
+    def mailbox(self) -> str:
+        """
+        Identify the mailbox the client's access token belongs to.
+
+        The address is looked up with one profile request per access token.
+        That request isn't rate limited itself, as it runs once per token.
+
+        Returns:
+            The mailbox's email address, or the hashed token if it can't be
+            looked up
+        """
+        token = (self.credentials or {}).get("token") or ""
+        key = hash_key(token)
+        if not token:
+            return key
+
+        mailbox = _token_mailboxes.get(key)
+        if mailbox is None:
+            if not self.service:
+                self._build_service()
+            try:
+                profile = self._execute(
+                    self.service.users().getProfile(userId="me", fields="emailAddress")
+                )
+            except HttpError as e:
+                # The request that is being rate limited reports the error
+                logger.warning("Could not look up the Gmail mailbox: %s", e)
+                return key
+            mailbox = profile["emailAddress"]
+            _token_mailboxes.set(key, mailbox)
+        return mailbox
+
+    def _thread_http(self) -> google_auth_httplib2.AuthorizedHttp | None:
+        """
+        Get the authorized HTTP connection owned by the current thread.
+
+        httplib2 connections are not thread-safe, so each worker thread that
+        issues requests for this client gets its own authorized wrapper around
+        the thread's shared connection.
+
+        Returns:
+            The thread's connection, or None to use the service's default
+        """
+        if self._google_credentials is None:
+            return None
+
+        http = getattr(self._thread_local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self._google_credentials, http=_shared_http()
+            )
+            self._thread_local.http = http
+
+        return http
+
+    def _execute(self, request: HttpRequest) -> dict[str, Any]:
         """
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+        Execute a Gmail API request on an HTTP connection owned by this thread.
+
+        Args:
+            request: The prepared Gmail API request
 
-        # If less than the minimum interval has passed, wait
-        min_interval = 60.0 / self.requests_per_minute
-        if time_since_last_request < min_interval:
-            time_to_wait = min_interval - time_since_last_request
-            time.sleep(time_to_wait)
+        Returns:
+            The decoded API response
+        """
+        http = self._thread_http()
+        if http is None:
+            return request.execute()
+        return request.execute(http=http)
+
+    def get_profile(self) -> dict[str, Any]:
+        """
+        Get the profile of the authenticated mailbox.
 
-        # Update last request time
-        self._last_request_time = time.time()
+        This is the cheapest authenticated Gmail call, so it doubles as a
+        token check.
+
+        Returns:
+            Profile with the email address and message/thread counts
+
+        Raises:
+            HttpError: If the request fails, e.g. because the token is invalid
+        """
+        self._rate_limit_request(1)
+
+        if not self.service:
+            self._build_service()
+
+        return self._execute(self.service.users().getProfile(userId="me"))
 
     def get_email_list(
         self, query: str = "", max_results: int = 100, page_token: str | None = None
@@ -234,7 +450,7 @@ class GmailClient:
                 self._build_service()
 
             # Execute the Gmail API request
-            result = (
+            result = self._execute(
                 self.service.users()
                 .messages()
                 .list(
@@ -243,7 +459,6 @@ class GmailClient:
                     maxResults=max_results,
                     pageToken=page_token,
                 )
-                .execute()
             )
 
             # Extract messages and next page token
@@ -290,12 +505,15 @@ class GmailClient:
             # Add a small delay between requests
             time.sleep(0.5)
 
-    def get_email_content(self, message_id: str) -> dict[str, Any]:
+    def get_email_content(
+        self, message_id: str, fields: str | None = None
+    ) -> dict[str, Any]:
         """
         Get the full content of an email by its ID.
 
         Args:
             message_id: The Gmail message ID
+            fields: Optional partial response mask limiting the returned fields
 
         Returns:
             Parsed email content as a dictionary
@@ -307,11 +525,10 @@ class GmailClient:
                 self._build_service()
 
             # Get the full message
-            result = (
+            result = self._execute(
                 self.service.users()
                 .messages()
-                .get(userId="me", id=message_id)
-                .execute()
+                .get(userId="me", id=message_id, **_fields_param(fields))
             )
 
             return self.parse_email_content(result)
@@ -319,6 +536,101 @@ class GmailClient:
             logger.exception("Error fetching email content")
             return {}
 
+    def get_email_content_conditional(
+        self, message_id: str, etag: str | None = None
+    ) -> tuple[dict[str, Any] | None, str | None]:
+        """
+        Get the full content of an email, revalidating a cached copy by ETag.
+
+        Args:
+            message_id: The Gmail message ID
+            etag: ETag of a previously fetched copy, sent as If-None-Match
+
+        Returns:
+            Tuple of the parsed email content and its current ETag. The content
+            is None if the message hasn't changed since the given ETag.
+
+        Raises:
+            HttpError: If the request fails, e.g. because the message doesn't
+                exist or Gmail is unavailable
+        """
+        try:
+            self._rate_limit_request()
+
+            if not self.service:
+                self._build_service()
+
+            request = self.service.users().messages().get(userId="me", id=message_id)
+            if etag:
+                request.headers["If-None-Match"] = etag
+
+            # The decoded body doesn't carry response headers, so capture the
+            # ETag before handing the response to the API model
+            response_etag = None
+            decode_response = request.postproc
+
+            def postproc(resp: dict[str, str], content: bytes) -> dict[str, Any]:
+                nonlocal response_etag
+                response_etag = resp.get("etag")
+                return decode_response(resp, content)
+
+            request.postproc = postproc
+            result = self._execute(request)
+
+            return self.parse_email_content(result), response_etag
+        except HttpError as e:
+            if etag and e.resp.status == HTTPStatus.NOT_MODIFIED:
+                return None, etag
+            raise
+
+    def batch_get_messages(
+        self, message_ids: list[str], fields: str | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get the full content of several emails in a single batch request.
+
+        Args:
+            message_ids: Gmail message IDs, at most BATCH_SIZE of them
+            fields: Optional partial response mask limiting the returned fields
+
+        Returns:
+            Parsed email content keyed by message ID. Messages that failed to
+            load are left out.
+        """
+        if not message_ids:
+            return {}
+
+        self._rate_limit_request(REQUEST_QUOTA_UNITS * len(message_ids))
+
+        if not self.service:
+            self._build_service()
+
+        results: dict[str, dict[str, Any]] = {}
+
+        def handle_response(
+            request_id: str, response: dict[str, Any], exception: HttpError | None
+        ) -> None:
+            if exception is not None:
+                logger.error(
+                    f"Error fetching email content for {request_id}: {exception}"
+                )
+                return
+            results[request_id] = self.parse_email_content(response)
+
+        batch: BatchHttpRequest = self.service.new_batch_http_request(
+            callback=handle_response
+        )
+        for message_id in message_ids:
+            batch.add(
+                self.service.users()
+                .messages()
+                .get(userId="me", id=message_id, **_fields_param(fields)),
+                request_id=message_id,
+            )
+
+        batch.execute(http=self._thread_http())
+        return results
+
     def get_attachment(self, message_id: str, attachment_id: str) -> bytes | None:
         """
         Get an email attachment.
@@ -337,12 +649,11 @@ class GmailClient:
                 self._build_service()
 
             # Get the attachment
-            attachment = (
+            attachment = self._execute(
                 self.service.users()
                 .messages()
                 .attachments()
                 .get(userId="me", messageId=message_id, id=attachment_id)
-                .execute()
             )
 
             # Get the attachment data
@@ -355,6 +666,55 @@ class GmailClient:
             logger.exception("Error fetching attachment")
             return None
 
+    def batch_get_attachments(
+        self, message_id: str, attachment_ids: list[str]
+    ) -> dict[str, bytes]:
+        """
+        Get several attachments of an email in a single batch request.
+
+        Args:
+            message_id: The Gmail message ID
+            attachment_ids: Attachment IDs, at most BATCH_SIZE of them
+
+        Returns:
+            Attachment binary data keyed by attachment ID. Attachments that
+            failed to load or have no data are left out.
+        """
+        if not attachment_ids:
+            return {}
+
+        self._rate_limit_request(REQUEST_QUOTA_UNITS * len(attachment_ids))
+
+        if not self.service:
+            self._build_service()
+
+        results: dict[str, bytes] = {}
+
+        def handle_response(
+            request_id: str, response: dict[str, Any], exception: HttpError | None
+        ) -> None:
+            if exception is not None:
+                logger.error(f"Error fetching attachment {request_id}: {exception}")
+                return
+            data = response.get("data")
+            if data:
+                results[request_id] = base64.urlsafe_b64decode(data)
+
+        batch: BatchHttpRequest = self.service.new_batch_http_request(
+            callback=handle_response
+        )
+        for attachment_id in attachment_ids:
+            batch.add(
+                self.service.users()
+                .messages()
+                .attachments()
+                .get(userId="me", messageId=message_id, id=attachment_id),
+                request_id=attachment_id,
+            )
+
+        batch.execute(http=self._thread_http())
+        return results
+
     def parse_email_content(self, message: dict[str, Any]) -> dict[str, Any]:
         """
         Parse Gmail API message format into a more usable structure.
@@ -1,13 +1,8 @@
 """Service for migrating emails from Gmail to Outlook."""
 
+import asyncio
 import logging
-
-# Type checking imports
-from typing import TYPE_CHECKING, Any
-
-if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
-
+from typing import Any
 
 from app.services.gmail.client import GmailClient
 from app.services.gmail.labels import GmailLabelsService
@@ -17,7 +12,13 @@ logger = logging.getLogger(__name__)
 
 
 class GmailToOutlookMigrationService:
-    """Service for migrating emails from Gmail to Outlook."""
+    """
+    Service for migrating emails from Gmail to Outlook.
+
+    The Gmail and Outlook clients are synchronous, so every API call runs in a
+    worker thread. That keeps the event loop free to publish progress and
+    serve other requests while a migration is running.
+    """
 
     def __init__(
         self, gmail_client: GmailClient, outlook_client: OutlookClient
@@ -33,22 +34,24 @@ class GmailToOutlookMigrationService:
         self.outlook_client = outlook_client
         self.labels_service = GmailLabelsService(gmail_client)
         self.folder_mapping: dict[str, str] = {}  # Gmail label ID -> Outlook folder ID
-        self.update_status_callback: Callable[[dict], Awaitable[None]] | None = None
+        # Queue receiving status updates, drained by whoever reports progress
+        self.status_events: asyncio.Queue[dict] | None = None
 
     async def _update_status(self, update: dict) -> None:
         """
         Update the migration status.
 
+        The update is only queued, so the migration loop never waits on the
+        clients following the progress unless the queue is full.
+
         Args:
             update: The status update
         """
-        logger.info(f"Updating migration status with: {update}")
-        if self.update_status_callback:
-            logger.info("Calling update_status_callback")
-            await self.update_status_callback(update)
-            logger.info("update_status_callback completed")
+        logger.debug("Updating migration status with: %s", update)
+        if self.status_events is not None:
+            await self.status_events.put(update)
         else:
-            logger.warning("No update_status_callback set, status update not sent")
+            logger.warning("No status_events queue set, status update not sent")
 
     async def migrate_labels_to_folders(self) -> dict[str, str]:
         """
@@ -58,7 +61,7 @@ class GmailToOutlookMigrationService:
             Dict mapping Gmail label IDs to Outlook folder IDs
         """
         # Get all Gmail labels
-        gmail_labels = self.labels_service.get_all_labels()
+        gmail_labels = await asyncio.to_thread(self.labels_service.get_all_labels)
         logger.info(f"Retrieved {len(gmail_labels)} labels from Gmail")
 
         # Count system and user labels
@@ -72,7 +75,7 @@ class GmailToOutlookMigrationService:
         )
 
         # Get existing Outlook folders to avoid duplicates
-        outlook_folders = self.outlook_client.get_folders()
+        outlook_folders = await asyncio.to_thread(self.outlook_client.get_folders)
         existing_folder_names = {folder["displayName"] for folder in outlook_folders}
         logger.info(f"Retrieved {len(outlook_folders)} folders from Outlook")
 
@@ -122,7 +125,9 @@ class GmailToOutlookMigrationService:
             # Create new folder
             try:
                 logger.info(f"Creating new Outlook folder for label: {gmail_name}")
-                new_folder = self.outlook_client.create_folder(name=gmail_name)
+                new_folder = await asyncio.to_thread(
+                    self.outlook_client.create_folder, name=gmail_name
+                )
                 folder_mapping[gmail_id] = new_folder["id"]
                 existing_folder_names.add(gmail_name)
                 logger.info(
@@ -206,8 +211,10 @@ class GmailToOutlookMigrationService:
             # Get emails with this label
             try:
                 logger.info(f"Getting emails with label {label_id}")
-                emails = self.gmail_client.get_emails_with_labels(
-                    label_ids=[label_id], max_results=max_emails
+                emails = await asyncio.to_thread(
+                    self.gmail_client.get_emails_with_labels,
+                    label_ids=[label_id],
+                    max_results=max_emails,
                 )
 
                 if not emails:
@@ -228,17 +235,16 @@ class GmailToOutlookMigrationService:
                     logger.warning(f"Could not get label name for {label_id}: {str(e)}")
 
                 # Update status with label info
-                if self.update_status_callback:
-                    await self.update_status_callback(
-                        {
-                            "current_label": label_name,
-                            "total_emails": len(emails),
-                            "logs": (
-                                f"Processing label: {label_name} "
-                                f"({len(emails)} emails)"
-                            ),
-                        }
-                    )
+                await self._update_status(
+                    {
+                        "current_label": label_name,
+                        "total_emails": len(emails),
+                        "logs": (
+                            f"Processing label: {label_name} "
+                            f"({len(emails)} emails)"
+                        ),
+                    }
+                )
 
             except Exception:
                 logger.exception("Error in migrate_emails_by_label")
@@ -254,41 +260,42 @@ class GmailToOutlookMigrationService:
                 logger.info(f"Processing email {i+1}/{len(emails)} (ID: {email_id})")
 
                 # Update status
-                if self.update_status_callback:
-                    await self.update_status_callback(
-                        {
-                            "processed_emails": i,
-                            "logs": (
-                                f"Processing email {i+1}/{len(emails)} "
-                                f"(ID: {email_id})"
-                            ),
-                        }
-                    )
+                await self._update_status(
+                    {
+                        "processed_emails": i,
+                        "logs": (
+                            f"Processing email {i+1}/{len(emails)} "
+                            f"(ID: {email_id})"
+                        ),
+                    }
+                )
 
                 try:
                     logger.info(
                         f"Migrating email {i+1}/{len(emails)} to Outlook folder"
                     )
-                    self.outlook_client.migrate_email(
-                        email, email.get("attachments", []), outlook_folder_id
+                    await asyncio.to_thread(
+                        self.outlook_client.migrate_email,
+                        email,
+                        email.get("attachments", []),
+                        outlook_folder_id,
                     )
                     successful += 1
                     logger.info(f"Successfully migrated email {i+1}/{len(emails)}")
 
                     # Update status with progress
-                    if self.update_status_callback:
-                        percent = round((i + 1) / len(emails) * 100, 1)
-                        await self.update_status_callback(
-                            {
-                                "processed_emails": i + 1,
-                                "successful_emails": successful,
-                                "failed_emails": failed,
-                                "logs": (
-                                    f"Label {label_name} progress: {percent}% "
-                                    f"({i+1}/{len(emails)} emails processed)"
-                                ),
-                            }
-                        )
+                    percent = round((i + 1) / len(emails) * 100, 1)
+                    await self._update_status(
+                        {
+                            "processed_emails": i + 1,
+                            "successful_emails": successful,
+                            "failed_emails": failed,
+                            "logs": (
+                                f"Label {label_name} progress: {percent}% "
+                                f"({i+1}/{len(emails)} emails processed)"
+                            ),
+                        }
+                    )
 
                 except Exception as e:
                     logger.exception(f"Failed to migrate email {email_id}")
@@ -296,18 +303,17 @@ class GmailToOutlookMigrationService:
                     failed_ids.append(email_id)
 
                     # Update status with failure
-                    if self.update_status_callback:
-                        await self.update_status_callback(
-                            {
-                                "processed_emails": i + 1,
-                                "successful_emails": successful,
-                                "failed_emails": failed,
-                                "logs": (
-                                    f"Failed to migrate email {i+1}/{len(emails)}: "
-                                    f"{str(e)}"
-                                ),
-                            }
-                        )
+                    await self._update_status(
+                        {
+                            "processed_emails": i + 1,
+                            "successful_emails": successful,
+                            "failed_emails": failed,
+                            "logs": (
+                                f"Failed to migrate email {i+1}/{len(emails)}: "
+                                f"{str(e)}"
+                            ),
+                        }
+                    )
 
             # Return results
             return {
@@ -334,7 +340,7 @@ class GmailToOutlookMigrationService:
             Migration results
         """
         # Get all Gmail labels
-        gmail_labels = self.labels_service.get_all_labels()
+        gmail_labels = await asyncio.to_thread(self.labels_service.get_all_labels)
 
         # Update status with total labels
         await self._update_status(
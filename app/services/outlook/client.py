@@ -4,29 +4,42 @@ import base64
 import json
 import logging
 import mimetypes
+from collections.abc import Iterable
 from typing import Any
 
 import httpx
 from fastapi import HTTPException, status
 
+from app.utils.http_client import get_sync_http_client
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Microsoft Graph API base URL
 GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
 
+# Graph only accepts file attachments up to 3 MB inline. Larger ones are sent
+# through an upload session in chunks, which must be multiples of 320 KiB
+MAX_INLINE_ATTACHMENT_SIZE = 3 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 10 * 320 * 1024
+
 
 class OutlookClient:
     """Client for interacting with Microsoft Graph API for Outlook mail."""
 
-    def __init__(self, access_token: str) -> None:
+    def __init__(
+        self, access_token: str, http_client: httpx.Client | None = None
+    ) -> None:
         """
         Initialize the Outlook client.
 
         Args:
             access_token: OAuth2 access token for Microsoft Graph API
+            http_client: HTTP client to send requests with, defaults to the
+                shared client
         """
         self.access_token = access_token
+        self.http_client = http_client or get_sync_http_client()
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
@@ -185,39 +198,39 @@ class OutlookClient:
                     f"{len(str(request_data.get('data', '')))}"
                 )
 
-            with httpx.Client(timeout=30.0) as client:
-                if method.upper() == "GET":
-                    logger.info("Executing GET request")
-                    response = client.get(url, headers=self.headers, params=params)
-                elif method.upper() == "POST":
-                    if request_data:
-                        # Handle custom request data with specific headers and data
-                        logger.info("Executing POST request with custom request data")
-                        custom_headers = {
-                            **self.headers,
-                            **request_data.get("headers", {}),
-                        }
-                        response = client.post(
-                            url,
-                            headers=custom_headers,
-                            data=request_data.get("data"),
-                            params=params,
-                        )
-                    else:
-                        logger.info("Executing POST request with JSON data")
-                        response = client.post(
-                            url, headers=self.headers, json=data, params=params
-                        )
-                elif method.upper() == "PUT":
-                    logger.info("Executing PUT request")
-                    response = client.put(
-                        url, headers=self.headers, json=data, params=params
+            client = self.http_client
+            if method.upper() == "GET":
+                logger.info("Executing GET request")
+                response = client.get(url, headers=self.headers, params=params)
+            elif method.upper() == "POST":
+                if request_data:
+                    # Handle custom request data with specific headers and data
+                    logger.info("Executing POST request with custom request data")
+                    custom_headers = {
+                        **self.headers,
+                        **request_data.get("headers", {}),
+                    }
+                    response = client.post(
+                        url,
+                        headers=custom_headers,
+                        data=request_data.get("data"),
+                        params=params,
                     )
-                elif method.upper() == "DELETE":
-                    logger.info("Executing DELETE request")
-                    response = client.delete(url, headers=self.headers, params=params)
                 else:
-                    raise_unsupported_method(method)
+                    logger.info("Executing POST request with JSON data")
+                    response = client.post(
+                        url, headers=self.headers, json=data, params=params
+                    )
+            elif method.upper() == "PUT":
+                logger.info("Executing PUT request")
+                response = client.put(
+                    url, headers=self.headers, json=data, params=params
+                )
+            elif method.upper() == "DELETE":
+                logger.info("Executing DELETE request")
+                response = client.delete(url, headers=self.headers, params=params)
+            else:
+                raise_unsupported_method(method)
 
             # Check if the request was successful
             logger.info(f"Response status code: {response.status_code}")
@@ -488,6 +501,8 @@ class OutlookClient:
         """
         Add an attachment to a message.
 
+        Attachments too large to send inline are uploaded in chunks.
+
         Args:
             message_id: ID of the message
             attachment_name: Name of the attachment
@@ -502,6 +517,11 @@ class OutlookClient:
             if content_type is None:
                 content_type = "application/octet-stream"
 
+        if len(content_bytes) > MAX_INLINE_ATTACHMENT_SIZE:
+            return self._upload_attachment(
+                message_id, attachment_name, content_bytes, content_type
+            )
+
         attachment_data = {
             "@odata.type": "#microsoft.graph.fileAttachment",
             "name": attachment_name,
@@ -512,9 +532,63 @@ class OutlookClient:
         return self._make_request(
             "POST",
             f"/me/messages/{message_id}/attachments",
-            request_data=attachment_data,
+            data=attachment_data,
+        )
+
+    def _upload_attachment(
+        self,
+        message_id: str,
+        attachment_name: str,
+        content_bytes: bytes,
+        content_type: str,
+    ) -> dict[str, Any]:
+        """
+        Upload a large attachment to a message through an upload session.
+
+        The content is sent as raw bytes in UPLOAD_CHUNK_SIZE pieces rather
+        than as one base64-encoded JSON body.
+
+        Args:
+            message_id: ID of the message
+            attachment_name: Name of the attachment
+            content_bytes: Binary content
+            content_type: MIME type of the attachment
+
+        Returns:
+            Dict[str, Any]: Attachment information, with its location
+        """
+        size = len(content_bytes)
+        session = self._make_request(
+            "POST",
+            f"/me/messages/{message_id}/attachments/createUploadSession",
+            data={
+                "AttachmentItem": {
+                    "attachmentType": "file",
+                    "name": attachment_name,
+                    "size": size,
+                    "contentType": content_type,
+                }
+            },
         )
 
+        # The upload URL is pre-authenticated, so it must not be sent the
+        # access token
+        upload_url = session["uploadUrl"]
+        for start in range(0, size, UPLOAD_CHUNK_SIZE):
+            chunk = content_bytes[start : start + UPLOAD_CHUNK_SIZE]
+            response = self.http_client.put(
+                upload_url,
+                content=chunk,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Range": f"bytes {start}-{start + len(chunk) - 1}/{size}",
+                },
+            )
+            response.raise_for_status()
+
+        logger.info(f"Uploaded attachment {attachment_name} in chunks")
+        return {"name": attachment_name, "location": response.headers.get("Location")}
+
     def send_message(self, message_id: str) -> dict[str, Any]:
         """
         Send a previously created draft message.
@@ -559,15 +633,18 @@ class OutlookClient:
     def migrate_email(
         self,
         gmail_message: dict[str, Any],
-        attachments: list[dict[str, Any]],
+        attachments: Iterable[dict[str, Any]],
         folder_id: str | None = None,
     ) -> dict[str, Any]:
         """
         Migrate an email from Gmail to Outlook.
 
+        Attachments are consumed one at a time, so a lazy iterable keeps only
+        the attachment being uploaded in memory.
+
         Args:
             gmail_message: Gmail message data
-            attachments: List of attachment data
+            attachments: Attachment data, with name, content and contentType
             folder_id: Target folder ID in Outlook
 
         Returns:
@@ -633,13 +710,10 @@ class OutlookClient:
 
             # Add attachments
             message_id = message.get("id")
-            if message_id and attachments:
-                logger.info(f"Adding {len(attachments)} attachments to message")
+            if message_id:
                 for i, attachment in enumerate(attachments):
-                    logger.info(
-                        f"Adding attachment {i+1}/{len(attachments)}: "
-                        f"{attachment.get('name', 'unnamed')}"
-                    )
+                    name = attachment.get("name", "unnamed")
+                    logger.info(f"Adding attachment {i+1}: {name}")
                     try:
                         self.add_attachment(
                             message_id=message_id,
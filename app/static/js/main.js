@@ -1170,6 +1170,41 @@ function initializeGoogleSignIn() {
     }
 }
 
+// Function to collect the Outlook tokens of a completed OAuth callback
+async function completeOutlookLogin(loginCode) {
+    try {
+        const response = await fetch('/outlook/token-exchange', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ login_code: loginCode })
+        });
+
+        if (!response.ok) {
+            throw new Error(`Server responded with ${response.status}`);
+        }
+
+        const data = await response.json();
+        logToConsole('Successfully connected to Outlook', 'success');
+        localStorage.setItem('outlookToken', data.access_token);
+
+        if (data.refresh_token) {
+            localStorage.setItem('outlookRefreshToken', data.refresh_token);
+        }
+
+        console.log('Storing Outlook email:', data.email);
+        localStorage.setItem('outlookUserEmail', data.email);
+        logToConsole(`Connected as ${data.email}`, 'info');
+
+        updateUIAfterOutlookConnection(true);
+    } catch (error) {
+        console.error('Error completing Outlook sign-in:', error);
+        logToConsole(`Error connecting to Outlook: ${error.message}`, 'error');
+        updateUIAfterOutlookConnection(false);
+    }
+}
+
 // Function to handle OAuth callback parameters from URL
 function handleOAuthCallback() {
     console.log('Checking for OAuth callback parameters');
@@ -1180,46 +1215,26 @@ function handleOAuthCallback() {
     const state = urlParams.get('state');
     const error = urlParams.get('error');
     const outlookAuth = urlParams.get('outlook_auth');
-    const token = urlParams.get('token');
-    const refreshToken = urlParams.get('refresh_token');
-    const email = urlParams.get('email');
+    const loginCode = urlParams.get('login_code');
 
     console.log('URL parameters:', {
         code: code ? `${code.substring(0, 10)}...` : null,
         state,
         error,
-        outlookAuth,
-        token: token ? `${token.substring(0, 10)}...` : null,
-        refreshToken: refreshToken ? `${refreshToken.substring(0, 10)}...` : null,
-        email
+        outlookAuth
     });
 
     // Clean up URL - remove parameters to prevent reprocessing on refresh
-    if (history.pushState && (code || state || error || outlookAuth || token)) {
+    if (history.pushState && (code || state || error || outlookAuth)) {
         const newurl = window.location.protocol + '//' + window.location.host + window.location.pathname;
         window.history.pushState({path: newurl}, '', newurl);
         console.log('Cleaned up URL parameters');
     }
 
-    // Handle Outlook auth success from redirect
-    if (outlookAuth === 'success' && token) {
-        logToConsole('Successfully connected to Outlook', 'success');
-        localStorage.setItem('outlookToken', token);
-
-        if (refreshToken) {
-            localStorage.setItem('outlookRefreshToken', refreshToken);
-        }
-
-        if (email) {
-            console.log('Storing Outlook email:', email);
-            localStorage.setItem('outlookUserEmail', decodeURIComponent(email));
-            logToConsole(`Connected as ${decodeURIComponent(email)}`, 'info');
-        } else {
-            console.warn('No email provided in the redirect URL');
-            localStorage.setItem('outlookUserEmail', 'Microsoft Account');
-        }
-
-        updateUIAfterOutlookConnection(true);
+    // Handle Outlook auth success from redirect. The redirect only carries
+    // a one-time code, which is swapped for the tokens
+    if (outlookAuth === 'success' && loginCode) {
+        completeOutlookLogin(loginCode);
         return;
     }
 
@@ -0,0 +1,134 @@
+"""In-memory caching utilities."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+# Type variable for cached values
+V = TypeVar("V")
+
+
+def hash_key(*parts: str) -> str:
+    """
+    Build a cache key from its parts without storing any of them verbatim.
+
+    Keys are usually derived from access tokens, which must never be kept
+    in memory or logged in plain form.
+
+    Args:
+        parts: Values identifying the cached item
+
+    Returns:
+        Hex-encoded SHA-256 digest of the joined parts
+    """
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class TTLCache(Generic[V]):
+    """A thread-safe, size-bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the oldest
+            ttl: Default time-to-live of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: V | None = None) -> V | None:
+        """
+        Get a value from the cache.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or the default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def get_entry(self, key: str) -> tuple[V, bool] | None:
+        """
+        Get a value from the cache even if it has expired.
+
+        Expired entries stay in the cache until they are evicted, so callers
+        can revalidate them instead of fetching from scratch.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of the cached value and whether it is still fresh, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(key)
+            expires_at, value = entry
+            return value, expires_at > time.monotonic()
+
+    def set(self, key: str, value: V, ttl: float | None = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, defaults to the cache TTL
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str, default: V | None = None) -> V | None:
+        """
+        Remove a value from the cache and return it.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The removed value or the default
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of entries, including expired ones not yet evicted."""
+        return len(self._entries)
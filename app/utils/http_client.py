@@ -0,0 +1,86 @@
+"""Shared HTTP client for outbound API calls."""
+
+import importlib.util
+import threading
+
+import httpx
+
+# Connection pool limits for the shared client. Enough connections stay alive
+# for every API worker thread (THREAD_POOL_SIZE in app.app) to reuse one
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 32
+REQUEST_TIMEOUT = 10.0
+# Timeout for the blocking API clients, which also upload message content
+SYNC_REQUEST_TIMEOUT = 30.0
+# Multiplex requests to the same host over one HTTP/2 connection when the
+# optional h2 package (httpx[http2]) is installed
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+_http_client: httpx.AsyncClient | None = None
+_sync_http_client: httpx.Client | None = None
+_sync_http_client_lock = threading.Lock()
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client, creating it on first use.
+
+    Reusing one client keeps connections to Google and Microsoft alive
+    between requests instead of paying a new TLS handshake for every call.
+    As a coroutine this runs on the event loop thread, so FastAPI resolves
+    the dependency without a threadpool hop and only one client is created.
+
+    Returns:
+        Shared async HTTP client
+    """
+    global _http_client  # noqa: PLW0603
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=REQUEST_TIMEOUT,
+            http2=HTTP2_ENABLED,
+        )
+    return _http_client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """
+    Get the shared blocking HTTP client, creating it on first use.
+
+    The blocking API clients run in worker threads; httpx.Client is safe to
+    share between them and keeps their connections alive across calls.
+
+    Returns:
+        Shared blocking HTTP client
+    """
+    global _sync_http_client  # noqa: PLW0603
+
+    with _sync_http_client_lock:
+        if _sync_http_client is None or _sync_http_client.is_closed:
+            _sync_http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=SYNC_REQUEST_TIMEOUT,
+                http2=HTTP2_ENABLED,
+            )
+        return _sync_http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients and release their connections."""
+    global _http_client, _sync_http_client  # noqa: PLW0603
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+    with _sync_http_client_lock:
+        if _sync_http_client is not None:
+            _sync_http_client.close()
+            _sync_http_client = None
@@ -0,0 +1,112 @@
+"""Queue-backed logging that keeps handler I/O off the request path."""
+
+import atexit
+import copy
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Format of every log line written by the application
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LOG_FORMAT doesn't show threads or processes, so records don't need to look
+# them up when they are created
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Listener started by the latest configure_logging call
+_listener: QueueListener | None = None
+
+# Renders tracebacks before records are queued
+_traceback_formatter = logging.Formatter()
+
+
+class _LocalQueueHandler(QueueHandler):
+    """Queue handler feeding a listener in the same process."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resolve the parts of a record that may change once the call returns.
+
+        The message arguments can be mutated by the caller after logging, so
+        the message is built now. The traceback is rendered now too, so the
+        queued record doesn't keep the exception's frames alive. Applying
+        LOG_FORMAT is left to the listener thread.
+
+        Args:
+            record: The record being logged
+
+        Returns:
+            A copy of the record with its message and traceback resolved
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def log_level(name: str) -> int:
+    """
+    Resolve a configured log level name.
+
+    Args:
+        name: Level name such as "INFO", in any case
+
+    Returns:
+        The numeric level, or INFO if the name is not a known level
+    """
+    return logging.getLevelNamesMapping().get(name.upper(), logging.INFO)
+
+
+def stop_logging() -> None:
+    """Stop the running listener, writing out the records still queued."""
+    global _listener  # noqa: PLW0603
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def configure_logging(level: int, *handlers: logging.Handler) -> QueueListener:
+    """
+    Route all log records through a queue to handlers on a background thread.
+
+    Logging calls only put the record on the queue and return. A listener
+    thread formats the records and writes them out, so slow streams or files
+    never block the event loop. Calling this again replaces the handlers.
+
+    Args:
+        level: Level of the root logger
+        handlers: Handlers the records are written to, defaults to stderr
+
+    Returns:
+        The started listener, which is stopped and flushed at exit
+    """
+    global _listener  # noqa: PLW0603
+
+    if not handlers:
+        handlers = (logging.StreamHandler(),)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    stop_logging()
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.handlers = [_LocalQueueHandler(log_queue)]
+    root.setLevel(level)
+
+    return _listener
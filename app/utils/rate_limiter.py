@@ -1,6 +1,7 @@
 """Rate limiting utilities for API calls."""
 
 import logging
+import threading
 import time
 from collections import deque
 from collections.abc import Callable
@@ -72,6 +73,70 @@ class RateLimiter:
         self.calls.append(current_time)
 
 
+class TokenBucket:
+    """
+    A thread-safe token bucket for quota-based rate limiting.
+
+    The bucket holds up to ``capacity`` tokens and refills continuously at
+    ``capacity`` tokens per ``period``, so bursts are allowed up to the quota
+    while the sustained rate never exceeds it.
+    """
+
+    def __init__(self, capacity: float, period: float = BASE_TIME_WINDOW) -> None:
+        """
+        Initialize the token bucket.
+
+        Args:
+            capacity: Maximum number of tokens, i.e. the quota per period
+            period: Time period in seconds over which the bucket fully refills
+        """
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, current_time: float) -> None:
+        """
+        Add the tokens accumulated since the last update.
+
+        Args:
+            current_time: Current monotonic timestamp
+        """
+        elapsed = current_time - self._updated_at
+        self.tokens = min(
+            self.capacity, self.tokens + elapsed * self.capacity / self.period
+        )
+        self._updated_at = current_time
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Take tokens from the bucket, waiting until enough are available.
+
+        Args:
+            tokens: Number of tokens the call costs
+
+        Raises:
+            ValueError: If more tokens are requested than the bucket can hold
+        """
+        if tokens > self.capacity:
+            msg = f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}"
+            raise ValueError(msg)
+
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                # Time until the missing tokens have been refilled
+                wait_time = (tokens - self.tokens) * self.period / self.capacity
+
+            # Sleep outside the lock so other threads can keep refilling
+            time.sleep(min(wait_time, MAX_REQUEST_WAIT_TIME))
+
+
 # Type for function that takes any arguments and returns type T
 FuncT = Callable[..., T]
 # Type for decorated function that takes any arguments and returns type T
@@ -0,0 +1,73 @@
+"""Signing utilities for tamper-proof client-side values."""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from typing import Any
+
+import orjson
+
+from app.config import settings
+
+
+def _b64encode(data: bytes) -> str:
+    """Encode bytes as unpadded URL-safe base64."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    """Decode unpadded URL-safe base64."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> bytes:
+    """Compute the HMAC-SHA256 signature of a payload."""
+    digest = hmac.new(
+        settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256
+    ).digest()
+    return _b64encode(digest).encode("ascii")
+
+
+def sign_value(data: dict[str, Any]) -> str:
+    """
+    Serialize and sign data so it can be stored client-side, e.g. in a cookie.
+
+    The value is signed, not encrypted, so whoever holds it can read the data.
+
+    Args:
+        data: JSON-serializable data to sign
+
+    Returns:
+        Signed value in the form ``payload.signature``
+    """
+    payload = _b64encode(orjson.dumps({"data": data, "iat": int(time.time())}))
+    return f"{payload}.{_signature(payload).decode('ascii')}"
+
+
+def unsign_value(value: str, max_age: float) -> dict[str, Any] | None:
+    """
+    Verify a signed value and return the data it holds.
+
+    Args:
+        value: Value produced by sign_value
+        max_age: Maximum age of the value in seconds
+
+    Returns:
+        The signed data, or None if the value is malformed, tampered or expired
+    """
+    payload, _, signature = value.rpartition(".")
+    if not payload or not hmac.compare_digest(
+        signature.encode("utf-8"), _signature(payload)
+    ):
+        return None
+
+    try:
+        decoded = orjson.loads(_b64decode(payload))
+    except (binascii.Error, orjson.JSONDecodeError):
+        return None
+
+    if time.time() - decoded.get("iat", 0) > max_age:
+        return None
+    return decoded.get("data")
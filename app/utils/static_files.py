@@ -0,0 +1,71 @@
+"""Static file serving with long-lived browser caching."""
+
+import hashlib
+from pathlib import Path
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Seconds browsers may keep a static file requested with the current version.
+# A deployment that changes any file changes the version, and so the URL
+VERSIONED_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def content_version(directory: Path) -> str:
+    """
+    Fingerprint the content of a directory of static files.
+
+    Args:
+        directory: Directory holding the static files
+
+    Returns:
+        Short hex digest that changes whenever any file is added or edited
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(directory.rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(directory).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class VersionedStaticFiles(StaticFiles):
+    """
+    Static files that can be cached for good when requested by version.
+
+    Templates append ?v=<version> to static URLs. Those responses are marked
+    immutable, so browsers stop requesting the files at all. Any other request
+    must revalidate, which Starlette answers with a 304 from the ETag.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Initialize the static files app.
+
+        Args:
+            directory: Directory holding the static files
+        """
+        super().__init__(directory=directory)
+        self.version = content_version(directory)
+        self._version_query = f"v={self.version}".encode()
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Serve a static file with cache headers matching its URL.
+
+        Args:
+            path: Path of the file within the directory
+            scope: ASGI scope of the request
+
+        Returns:
+            The file, not-modified or not-found response
+        """
+        response = await super().get_response(path, scope)
+        if scope["query_string"] == self._version_query:
+            response.headers["Cache-Control"] = (
+                f"public, max-age={VERSIONED_MAX_AGE}, immutable"
+            )
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
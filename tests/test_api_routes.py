@@ -1,16 +1,32 @@
 """Tests for API routes."""
 
 from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlsplit
 
+import httplib2
 import pytest
 from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
 
-from app.app import create_app
+from app.api.routers.gmail import (
+    EmailResponse,
+    attachment_cache,
+    email_cache,
+    list_cache,
+)
+from app.app import CORS_MAX_AGE, create_app
+from app.services.gmail.auth import token_cache
+from app.services.gmail.client import EMAIL_SUMMARY_FIELDS
+from app.utils.cache import hash_key
 
 
 @pytest.fixture()
 def client():
     """Fixture for FastAPI test client."""
+    email_cache.clear()
+    attachment_cache.clear()
+    list_cache.clear()
+    token_cache.clear()
     app = create_app(testing=True)
     return TestClient(app)
 
@@ -29,11 +45,16 @@ def mock_oauth_flow():
         yield mock_flow
 
 
+# Mailbox the mocked Gmail client is authorized for
+MAILBOX = "user@example.com"
+
+
 @pytest.fixture()
 def mock_gmail_client():
     """Fixture for mock Gmail client."""
     with patch("app.dependencies.GmailClient") as mock:
         mock_client = MagicMock()
+        mock_client.cached_mailbox.return_value = MAILBOX
         mock_client.get_email_list.return_value = {
             "messages": [
                 {"id": "msg1", "snippet": "Test email 1"},
@@ -41,14 +62,24 @@ def mock_gmail_client():
             ],
             "next_page_token": None,
         }
-        mock_client.get_email_content.return_value = {
-            "id": "msg1",
-            "subject": "Test Subject",
-            "from": "sender@example.com",
-            "date": "2023-03-30T12:00:00Z",
-            "body": {"plain": "Test email body", "html": "<div>Test email body</div>"},
-            "attachments": [],
+        mock_client.batch_get_messages.return_value = {
+            "msg1": {"id": "msg1", "thread_id": "t1", "subject": "Test email 1"},
+            "msg2": {"id": "msg2", "thread_id": "t2", "subject": "Test email 2"},
         }
+        mock_client.get_email_content_conditional.return_value = (
+            {
+                "id": "msg1",
+                "subject": "Test Subject",
+                "from": "sender@example.com",
+                "date": "2023-03-30T12:00:00Z",
+                "body": {
+                    "plain": "Test email body",
+                    "html": "<div>Test email body</div>",
+                },
+                "attachments": [],
+            },
+            '"etag-1"',
+        )
         mock.return_value = mock_client
         yield mock_client
 
@@ -123,6 +154,54 @@ def test_auth_callback_get(client, mock_oauth_flow):
             assert "test_token" in response.text
 
 
+def test_auth_callback_escapes_script_values(client, mock_oauth_flow):
+    """Test that token and profile values can't break out of the script."""
+    with (
+        patch("app.api.routers.gmail.exchange_code") as mock_exchange_code,
+        patch(
+            "app.api.routers.gmail.fetch_user_profile",
+            return_value='{"name":"</script><script>alert(1)</script>"}',
+        ),
+    ):
+        mock_exchange_code.return_value = {"access_token": "tok');alert('x"}
+        response = client.get("/gmail/auth-callback?code=test_code")
+
+        assert response.status_code == 200
+        assert "<script>alert(1)" not in response.text
+        assert "localStorage.setItem('gmailToken', \"tok');alert('x\");" in (
+            response.text
+        )
+
+
+def test_auth_callback_credentials_reused(client, mock_oauth_flow):
+    """Test that API calls use the full credentials stored at sign-in."""
+    with (
+        patch("app.api.routers.gmail.exchange_code") as mock_exchange_code,
+        patch(
+            "app.api.routers.gmail.fetch_user_profile",
+            return_value='{"name":"Test User","email":"test@example.com","picture":""}',
+        ),
+        patch("app.dependencies.GmailClient") as mock_client_class,
+    ):
+        mock_exchange_code.return_value = {
+            "access_token": "test_token",
+            "refresh_token": "test_refresh_token",
+            "expires_in": 3600,
+        }
+        client.get("/gmail/auth-callback?code=test_code")
+
+        mock_client_class.return_value.cached_mailbox.return_value = MAILBOX
+        mock_client_class.return_value.get_email_list.return_value = {"messages": []}
+        response = client.get(
+            "/gmail/emails", headers={"Authorization": "Bearer test_token"}
+        )
+
+        assert response.status_code == 200
+        credentials = mock_client_class.call_args.args[0]
+        assert credentials["token"] == "test_token"
+        assert credentials["refresh_token"] == "test_refresh_token"
+
+
 def test_get_emails(client, mock_gmail_client):
     """Test getting emails endpoint."""
     with patch("app.dependencies.get_gmail_client", return_value=mock_gmail_client):
@@ -139,6 +218,55 @@ def test_get_emails(client, mock_gmail_client):
         )
 
 
+def test_get_emails_skips_failed_messages(client, mock_gmail_client):
+    """Test that messages missing from the batch don't fail the whole page."""
+    mock_gmail_client.batch_get_messages.return_value = {
+        "msg1": {"id": "msg1", "thread_id": "t1", "subject": "Ok", "snippet": "Ok"},
+    }
+
+    response = client.get(
+        "/gmail/emails", headers={"Authorization": "Bearer test_token"}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert len(data) == 1
+    mock_gmail_client.batch_get_messages.assert_called_once_with(
+        ["msg1", "msg2"], EMAIL_SUMMARY_FIELDS
+    )
+    mock_gmail_client.get_email_content.assert_not_called()
+
+
+def test_get_emails_cached(client, mock_gmail_client):
+    """Test that repeat listings are served from the cache."""
+    headers = {"Authorization": "Bearer test_token"}
+
+    first = client.get("/gmail/emails?query=test", headers=headers)
+    second = client.get("/gmail/emails?query=test", headers=headers)
+    other_query = client.get("/gmail/emails?query=other", headers=headers)
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert other_query.headers["X-Cache"] == "MISS"
+    assert mock_gmail_client.get_email_list.call_count == 2
+
+
+def test_get_emails_stale(client, mock_gmail_client):
+    """Test that stale listings are returned while being refreshed."""
+    cache_key = hash_key(MAILBOX, "", "", "100")
+    stale_page = [EmailResponse(id="old", thread_id="t0", subject="Old", snippet="Old")]
+    list_cache.set(cache_key, (0.0, stale_page))
+
+    response = client.get(
+        "/gmail/emails", headers={"Authorization": "Bearer test_token"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "STALE"
+    assert [email["id"] for email in response.json()] == ["old"]
+
+
 def test_get_email_detail(client, mock_gmail_client):
     """Test getting email detail endpoint."""
     with patch("app.dependencies.get_gmail_client", return_value=mock_gmail_client):
@@ -150,7 +278,136 @@ def test_get_email_detail(client, mock_gmail_client):
         assert response.status_code == 200
         assert data["id"] == "msg1"
         assert data["subject"] == "Test Subject"
-        mock_gmail_client.get_email_content.assert_called_once_with("msg1")
+        mock_gmail_client.get_email_content_conditional.assert_called_once_with(
+            "msg1", None
+        )
+
+
+def test_get_email_detail_cached(client, mock_gmail_client):
+    """Test that repeat email views are served from the cache."""
+    headers = {"Authorization": "Bearer test_token"}
+
+    first = client.get("/gmail/emails/msg1", headers=headers)
+    second = client.get("/gmail/emails/msg1", headers=headers)
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    mock_gmail_client.get_email_content_conditional.assert_called_once_with(
+        "msg1", None
+    )
+
+
+def test_get_email_detail_cached_across_token_refresh(client, mock_gmail_client):
+    """Test that cached emails are found with a refreshed access token."""
+    mock_gmail_client.cached_mailbox.return_value = None
+    mock_gmail_client.mailbox.return_value = MAILBOX
+
+    first = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer old_token"}
+    )
+    second = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer new_token"}
+    )
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    mock_gmail_client.get_email_content_conditional.assert_called_once_with(
+        "msg1", None
+    )
+
+
+def test_get_email_detail_revalidated(client, mock_gmail_client):
+    """Test that expired cache entries are revalidated with their ETag."""
+    cache_key = hash_key(MAILBOX, "msg1")
+    email_cache.set(cache_key, ('"etag-1"', {"id": "msg1", "subject": "Old"}), ttl=0)
+    mock_gmail_client.get_email_content_conditional.return_value = (None, '"etag-1"')
+
+    response = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer test_token"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "REVALIDATED"
+    assert response.json()["subject"] == "Old"
+    mock_gmail_client.get_email_content_conditional.assert_called_once_with(
+        "msg1", '"etag-1"'
+    )
+
+
+@pytest.mark.parametrize(
+    "error",
+    [HttpError(httplib2.Response({"status": 503}), b""), TimeoutError()],
+)
+def test_get_email_detail_stale_on_error(client, mock_gmail_client, error):
+    """Test that an expired copy is served when revalidation fails."""
+    cache_key = hash_key(MAILBOX, "msg1")
+    email_cache.set(cache_key, ('"etag-1"', {"id": "msg1", "subject": "Old"}), ttl=0)
+    mock_gmail_client.get_email_content_conditional.side_effect = error
+
+    response = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer test_token"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "STALE"
+    assert response.json()["subject"] == "Old"
+
+
+def test_get_email_detail_not_found(client, mock_gmail_client):
+    """Test that a 404 is only returned when Gmail reports the message missing."""
+    cache_key = hash_key(MAILBOX, "msg1")
+    email_cache.set(cache_key, ('"etag-1"', {"id": "msg1", "subject": "Old"}), ttl=0)
+    mock_gmail_client.get_email_content_conditional.side_effect = HttpError(
+        httplib2.Response({"status": 404}), b""
+    )
+
+    response = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer test_token"}
+    )
+
+    assert response.status_code == 404
+
+
+def test_get_email_detail_error_without_cache(client, mock_gmail_client):
+    """Test that a failed fetch with nothing cached is a server error."""
+    mock_gmail_client.get_email_content_conditional.side_effect = HttpError(
+        httplib2.Response({"status": 503}), b""
+    )
+
+    response = client.get(
+        "/gmail/emails/msg1", headers={"Authorization": "Bearer test_token"}
+    )
+
+    assert response.status_code == 500
+
+
+def test_get_attachment(client, mock_gmail_client):
+    """Test downloading an attachment as raw bytes."""
+    mock_gmail_client.get_attachment.return_value = b"\x89PNG\x00binary"
+
+    response = client.get(
+        "/gmail/emails/msg1/attachments/att1",
+        headers={"Authorization": "Bearer test_token"},
+    )
+
+    assert response.status_code == 200
+    assert response.content == b"\x89PNG\x00binary"
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"] == 'attachment; filename="att1"'
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_get_attachment_not_found(client, mock_gmail_client):
+    """Test that a missing attachment returns 404."""
+    mock_gmail_client.get_attachment.return_value = None
+
+    response = client.get(
+        "/gmail/emails/msg1/attachments/missing",
+        headers={"Authorization": "Bearer test_token"},
+    )
+
+    assert response.status_code == 404
 
 
 def test_unauthorized_access(client):
@@ -160,3 +417,226 @@ def test_unauthorized_access(client):
 
     assert response.status_code == 401
     assert "detail" in data
+
+
+@pytest.mark.parametrize(
+    "authorization",
+    ["test_token", "Bearer ", "Bearer a b", "Bearer <script>", "Basic dXNlcg=="],
+)
+@patch("app.dependencies.get_cached_credentials")
+def test_malformed_authorization_rejected(mock_get_credentials, client, authorization):
+    """Test that malformed Authorization headers are rejected up front."""
+    response = client.get("/gmail/emails", headers={"Authorization": authorization})
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    mock_get_credentials.assert_not_called()
+
+
+def test_validate_token_without_session(client):
+    """Test token validation without a session cookie."""
+    response = client.get("/gmail/validate-token")
+
+    assert response.status_code == 401
+    assert response.json()["valid"] is False
+
+
+def test_validate_token_with_session_cookie(client, mock_oauth_flow):
+    """Test token validation using the cookie set by the OAuth callback."""
+    with (
+        patch("app.api.routers.gmail.exchange_code") as mock_exchange_code,
+        patch(
+            "app.api.routers.gmail.fetch_user_profile",
+            return_value='{"name":"Test User","email":"test@example.com","picture":""}',
+        ),
+        patch("app.api.routers.gmail.GmailClient") as mock_client_class,
+        patch("app.api.routers.gmail.settings.DEBUG", True),
+    ):
+        mock_exchange_code.return_value = {"access_token": "test_token"}
+        callback = client.get("/gmail/auth-callback?code=test_code")
+        assert "httponly" in callback.headers["set-cookie"].lower()
+
+        response = client.get("/gmail/validate-token")
+
+        assert response.status_code == 200
+        assert response.json()["valid"] is True
+        credentials = mock_client_class.call_args.args[0]
+        assert credentials["token"] == "test_token"
+        mock_client_class.return_value.get_profile.assert_called_once()
+
+
+@patch("app.api.routers.outlook.OutlookClient")
+def test_validate_outlook_token(mock_client_class, client):
+    """Test that a valid Outlook token from the Authorization header is accepted."""
+    response = client.get(
+        "/outlook/validate-token", headers={"Authorization": "Bearer graph_token"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["valid"] is True
+    mock_client_class.assert_called_once_with("graph_token")
+    mock_client_class.return_value.get_folders.assert_called_once()
+
+
+def test_validate_outlook_token_without_header(client):
+    """Test Outlook token validation without an Authorization header."""
+    response = client.get("/outlook/validate-token")
+
+    assert response.status_code == 401
+    assert response.json()["valid"] is False
+
+
+def test_outlook_auth_callback_get(client):
+    """Test that the Outlook callback hands the tokens over with a one-time code."""
+    with patch("app.api.routers.outlook.outlook_oauth_flow") as mock_flow:
+        mock_flow.exchange_code.return_value = {
+            "access_token": "opaque+token/value",
+            "refresh_token": "refresh&token",
+        }
+        with patch(
+            "app.api.routers.outlook._get_user_profile_email",
+            return_value="user+tag@example.com",
+        ):
+            response = client.get(
+                "/outlook/auth-callback?code=test_code", follow_redirects=False
+            )
+
+    assert response.status_code == 307
+    location = response.headers["location"]
+    assert "token" not in location
+    params = parse_qs(urlsplit(location).query)
+    assert params["outlook_auth"] == ["success"]
+
+    login_request = {"login_code": params["login_code"][0]}
+    exchange = client.post("/outlook/token-exchange", json=login_request)
+    assert exchange.status_code == 200
+    assert exchange.json() == {
+        "access_token": "opaque+token/value",
+        "refresh_token": "refresh&token",
+        "email": "user+tag@example.com",
+    }
+
+    # The code can only be used once
+    reused = client.post("/outlook/token-exchange", json=login_request)
+    assert reused.status_code == 400
+
+
+def test_list_outlook_folders(client):
+    """Test listing Outlook folders."""
+    with patch("app.dependencies.OutlookClient") as mock_client_class:
+        mock_client_class.return_value.get_folders.return_value = [
+            {"id": "f1", "displayName": "Inbox", "totalItemCount": 3},
+            {"id": "f2", "displayName": "Archive", "parentFolderId": "f1"},
+        ]
+
+        response = client.get(
+            "/outlook/folders", headers={"X-Destination-Token": "graph_token"}
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [folder["display_name"] for folder in data] == ["Inbox", "Archive"]
+    assert data[0]["total_item_count"] == 3
+    assert data[1]["parent_folder_id"] == "f1"
+    assert data[1]["unread_item_count"] == 0
+
+
+def test_batch_migrate(client, mock_gmail_client):
+    """Test migrating a batch of emails with one failure."""
+
+    def get_email_content(email_id):
+        if email_id == "bad":
+            raise RuntimeError
+        attachments = [{"id": "a1", "filename": "a.txt", "mimeType": "text/plain"}]
+        return {"id": email_id, "attachments": attachments if email_id == "m1" else []}
+
+    mock_gmail_client.get_email_content.side_effect = get_email_content
+    mock_gmail_client.batch_get_attachments.return_value = {"a1": b"data"}
+
+    with patch("app.dependencies.OutlookClient") as mock_client_class:
+        mock_outlook = mock_client_class.return_value
+        mock_outlook.migrate_email.return_value = {"id": "outlook-id"}
+
+        response = client.post(
+            "/outlook/batch-migrate",
+            json=["m1", "bad", "m2"],
+            headers={
+                "Authorization": "Bearer test_token",
+                "X-Destination-Token": "graph_token",
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "successful": 2,
+        "failed": 1,
+        "failed_ids": ["bad"],
+    }
+    assert mock_outlook.migrate_email.call_count == 2
+    attachments = next(
+        list(call.kwargs["attachments"])
+        for call in mock_outlook.migrate_email.call_args_list
+        if call.kwargs["gmail_message"]["id"] == "m1"
+    )
+    assert attachments == [
+        {"name": "a.txt", "content": b"data", "contentType": "text/plain"}
+    ]
+
+
+def test_routes_are_unique(client):
+    """Test that no two routes handle the same path and method."""
+    seen = set()
+    for route in client.app.routes:
+        for method in getattr(route, "methods", None) or ():
+            key = (route.path, method)
+            assert key not in seen, f"Duplicate route: {method} {route.path}"
+            seen.add(key)
+
+
+def test_cors_preflight_is_cacheable():
+    """Test that preflight responses are cacheable and don't allow credentials."""
+    with patch("app.app.settings.CORS_ORIGINS", ["https://example.com"]):
+        client = TestClient(create_app(testing=True))
+
+    response = client.options(
+        "/outlook/folders",
+        headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "GET",
+            "Access-Control-Request-Headers": "Authorization",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert response.headers["access-control-max-age"] == str(CORS_MAX_AGE)
+    assert "access-control-allow-credentials" not in response.headers
+
+
+@pytest.mark.parametrize(
+    ("origin", "method"),
+    [("https://other.example.com", "GET"), ("https://example.com", "DELETE")],
+)
+def test_cors_preflight_is_restricted(origin, method):
+    """Test that unknown origins and unused methods are not allowed."""
+    with patch("app.app.settings.CORS_ORIGINS", ["https://example.com"]):
+        client = TestClient(create_app(testing=True))
+
+    response = client.options(
+        "/outlook/folders",
+        headers={"Origin": origin, "Access-Control-Request-Method": method},
+    )
+
+    assert response.status_code == 400
+
+
+def test_flask_style_test_client_is_reused():
+    """Test that the Flask-style test client is built once per app."""
+    app = create_app(testing=True)
+    test_client = app.test_client()
+
+    assert app.test_client() is test_client
+    with test_client:
+        assert test_client.get("/docs").status_code == 200
+        assert test_client.get("/redoc").status_code == 200
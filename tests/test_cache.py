@@ -0,0 +1,97 @@
+"""Tests for the in-memory cache utility."""
+
+from unittest.mock import patch
+
+from app.utils.cache import TTLCache, hash_key
+
+
+class TestTTLCache:
+    """Test cases for the TTLCache class."""
+
+    def test_set_and_get(self):
+        """Test storing and retrieving a value."""
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("key", {"id": "msg1"})
+
+        assert cache.get("key") == {"id": "msg1"}
+        assert len(cache) == 1
+
+    def test_get_missing_returns_default(self):
+        """Test that a missing key returns the default value."""
+        cache = TTLCache(maxsize=10, ttl=60.0)
+
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    @patch("time.monotonic")
+    def test_expired_entry_is_evicted(self, mock_monotonic):
+        """Test that entries are dropped once their TTL has passed."""
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("key", "value")
+
+        mock_monotonic.return_value = 159.0
+        assert cache.get("key") == "value"
+
+        mock_monotonic.return_value = 161.0
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    @patch("time.monotonic")
+    def test_per_entry_ttl(self, mock_monotonic):
+        """Test that an explicit TTL overrides the cache default."""
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("key", "value", ttl=5.0)
+
+        mock_monotonic.return_value = 106.0
+        assert cache.get("key") is None
+
+    @patch("time.monotonic")
+    def test_get_entry_returns_stale_values(self, mock_monotonic):
+        """Test that expired entries can still be read for revalidation."""
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("key", "value")
+
+        assert cache.get_entry("key") == ("value", True)
+
+        mock_monotonic.return_value = 161.0
+        assert cache.get_entry("key") == ("value", False)
+        assert cache.get_entry("missing") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=60.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Touch "a" so "b" becomes the least recently used entry
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_and_clear(self):
+        """Test removing single entries and clearing the cache."""
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+def test_hash_key():
+    """Test that cache keys are stable and don't leak their parts."""
+    key = hash_key("secret_token", "msg1")
+
+    assert key == hash_key("secret_token", "msg1")
+    assert key != hash_key("other_token", "msg1")
+    assert key != hash_key("secret_tokenmsg1")
+    assert "secret_token" not in key
@@ -1,12 +1,20 @@
 """Tests for Gmail OAuth authentication flow."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 from google.auth.exceptions import GoogleAuthError
 
-from app.services.gmail.auth import OAuthFlow, exchange_code
+from app.services.gmail import auth as auth_module
+from app.services.gmail.auth import (
+    OAuthFlow,
+    cache_token_response,
+    exchange_code,
+    get_cached_credentials,
+    token_cache,
+)
+from app.utils import cache as cache_module
 
 
 class TestOAuthFlow:
@@ -215,14 +223,12 @@ class TestOAuthFlow:
 
 @pytest.mark.asyncio()
 @patch("app.services.gmail.auth.requests.post")
-@patch("os.getenv")
-async def test_exchange_code_function_success(mock_getenv, mock_post):
+@patch("app.services.gmail.auth.settings")
+async def test_exchange_code_function_success(mock_settings, mock_post):
     """Test the standalone exchange_code function."""
-    # Configure mock environment variables
-    mock_getenv.side_effect = lambda key, default=None: {
-        "GMAIL_CLIENT_ID": "test-client-id",
-        "GMAIL_CLIENT_SECRET": "test-client-secret",
-    }.get(key, default)
+    # Configure mock settings
+    mock_settings.GMAIL_CLIENT_ID = "test-client-id"
+    mock_settings.GMAIL_CLIENT_SECRET = "test-client-secret"
 
     # Mock the response from Google's token endpoint
     mock_response = MagicMock()
@@ -247,14 +253,12 @@ async def test_exchange_code_function_success(mock_getenv, mock_post):
 
 
 @pytest.mark.asyncio()
-@patch("os.getenv")
-async def test_exchange_code_function_missing_config(mock_getenv):
+@patch("app.services.gmail.auth.settings")
+async def test_exchange_code_function_missing_config(mock_settings):
     """Test the exchange_code function with missing configuration."""
-    # Configure mock environment variables with missing client ID
-    mock_getenv.side_effect = lambda key, default=None: {
-        "GMAIL_CLIENT_ID": "",
-        "GMAIL_CLIENT_SECRET": "test-client-secret",
-    }.get(key, default)
+    # Configure mock settings with missing client ID
+    mock_settings.GMAIL_CLIENT_ID = ""
+    mock_settings.GMAIL_CLIENT_SECRET = "test-client-secret"
 
     with pytest.raises(HTTPException) as excinfo:
         await exchange_code("test-code", "http://localhost:8000/callback")
@@ -265,14 +269,12 @@ async def test_exchange_code_function_missing_config(mock_getenv):
 
 @pytest.mark.asyncio()
 @patch("app.services.gmail.auth.requests.post")
-@patch("os.getenv")
-async def test_exchange_code_function_error_response(mock_getenv, mock_post):
+@patch("app.services.gmail.auth.settings")
+async def test_exchange_code_function_error_response(mock_settings, mock_post):
     """Test the exchange_code function with error response."""
-    # Configure mock environment variables
-    mock_getenv.side_effect = lambda key, default=None: {
-        "GMAIL_CLIENT_ID": "test-client-id",
-        "GMAIL_CLIENT_SECRET": "test-client-secret",
-    }.get(key, default)
+    # Configure mock settings
+    mock_settings.GMAIL_CLIENT_ID = "test-client-id"
+    mock_settings.GMAIL_CLIENT_SECRET = "test-client-secret"
 
     # Mock an error response
     mock_response = MagicMock()
@@ -290,3 +292,86 @@ async def test_exchange_code_function_error_response(mock_getenv, mock_post):
     # The standalone function uses 400 for error responses
     assert excinfo.value.status_code == 400
     assert "Error exchanging code" in str(excinfo.value.detail)
+
+
+@pytest.mark.asyncio()
+async def test_get_cached_credentials():
+    """Test looking up credentials stored after the token exchange."""
+    token_cache.clear()
+    cache_token_response(
+        {
+            "access_token": "test-access-token",
+            "refresh_token": "test-refresh-token",
+            "expires_in": 3600,
+        }
+    )
+    http_client = AsyncMock()
+
+    credentials = await get_cached_credentials("test-access-token", http_client)
+
+    assert credentials["token"] == "test-access-token"
+    assert credentials["refresh_token"] == "test-refresh-token"
+    http_client.post.assert_not_called()
+    assert await get_cached_credentials("unknown-token", http_client) is None
+
+
+@pytest.mark.asyncio()
+async def test_get_cached_credentials_refreshes_expiring_token():
+    """Test that tokens about to expire are refreshed proactively."""
+    token_cache.clear()
+    cache_token_response(
+        {
+            "access_token": "test-access-token",
+            "refresh_token": "test-refresh-token",
+            "expires_in": 30,
+        }
+    )
+    mock_response = MagicMock()
+    mock_response.json.return_value = {
+        "access_token": "new-access-token",
+        "expires_in": 3600,
+    }
+    http_client = AsyncMock()
+    http_client.post.return_value = mock_response
+
+    credentials = await get_cached_credentials("test-access-token", http_client)
+
+    assert credentials["token"] == "new-access-token"
+    http_client.post.assert_called_once()
+    # The refreshed credentials stay reachable through the original token
+    cached = await get_cached_credentials("test-access-token", http_client)
+    assert cached["token"] == "new-access-token"
+    http_client.post.assert_called_once()
+
+
+@pytest.mark.asyncio()
+async def test_get_cached_credentials_refreshes_hour_long_token():
+    """Test that an hour-long token is still cached when its refresh is due."""
+    token_cache.clear()
+    clock = MagicMock()
+    clock.time.return_value = clock.monotonic.return_value = 1000.0
+    mock_response = MagicMock()
+    mock_response.json.return_value = {
+        "access_token": "new-access-token",
+        "expires_in": 3600,
+    }
+    http_client = AsyncMock()
+    http_client.post.return_value = mock_response
+
+    with (
+        patch.object(auth_module, "time", clock),
+        patch.object(cache_module, "time", clock),
+    ):
+        cache_token_response(
+            {
+                "access_token": "test-access-token",
+                "refresh_token": "test-refresh-token",
+                "expires_in": 3600,
+            }
+        )
+        clock.time.return_value = clock.monotonic.return_value = 1000.0 + 59.5 * 60
+
+        credentials = await get_cached_credentials("test-access-token", http_client)
+
+    assert credentials["token"] == "new-access-token"
+    http_client.post.assert_called_once()
@@ -4,11 +4,16 @@ import base64
 import json
 import os
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import httplib2
 import pytest
+from googleapiclient.errors import HttpError
 
-from app.services.gmail.client import GmailClient
+from app.services.gmail import client as client_module
+from app.services.gmail.client import EMAIL_SUMMARY_FIELDS, GmailClient
 from app.services.gmail.labels import GmailLabelsService
 
 # Constants for test data
@@ -80,7 +85,7 @@ def test_init() -> None:
     assert client.service is None
 
 
-@patch("app.services.gmail.client.build")
+@patch("app.services.gmail.client.build_from_document")
 @patch("app.services.gmail.client.InstalledAppFlow")
 def test_authenticate(
     mock_installed_app_flow: MagicMock,
@@ -210,6 +215,65 @@ def test_get_email_content(
     assert result["attachments"][0]["id"] == TEST_ATTACHMENT_ID
 
 
+def test_get_email_content_conditional_not_modified(
+    gmail_client: GmailClient, mock_gmail_service: MagicMock
+) -> None:
+    """Test revalidating an email that hasn't changed."""
+    # Setup
+    mock_request = mock_gmail_service.users.return_value.messages.return_value.get
+    mock_request.return_value.execute.side_effect = HttpError(
+        httplib2.Response({"status": 304}), b""
+    )
+
+    # Execute
+    result, etag = gmail_client.get_email_content_conditional(TEST_EMAIL_ID, '"etag-1"')
+
+    # Verify
+    mock_request.return_value.headers.__setitem__.assert_called_once_with(
+        "If-None-Match", '"etag-1"'
+    )
+    assert result is None
+    assert etag == '"etag-1"'
+
+
+def test_get_email_content_conditional_error(
+    gmail_client: GmailClient, mock_gmail_service: MagicMock
+) -> None:
+    """Test that failures other than 304 are raised to the caller."""
+    mock_request = mock_gmail_service.users.return_value.messages.return_value.get
+    mock_request.return_value.execute.side_effect = HttpError(
+        httplib2.Response({"status": 503}), b""
+    )
+
+    with pytest.raises(HttpError):
+        gmail_client.get_email_content_conditional(TEST_EMAIL_ID, '"etag-1"')
+
+
+def test_batch_get_messages(
+    gmail_client: GmailClient, mock_gmail_service: MagicMock
+) -> None:
+    """Test fetching several emails in one batch request."""
+    # Setup
+    mock_batch = mock_gmail_service.new_batch_http_request.return_value
+
+    def execute_batch(http=None):
+        callback = mock_gmail_service.new_batch_http_request.call_args.kwargs[
+            "callback"
+        ]
+        callback("msg1", {"id": "msg1", "threadId": "thread1", "payload": {}}, None)
+        callback("msg2", None, Exception("Not found"))
+
+    mock_batch.execute.side_effect = execute_batch
+
+    # Execute
+    result = gmail_client.batch_get_messages(["msg1", "msg2"])
+
+    # Verify
+    assert mock_batch.add.call_count == 2
+    assert list(result) == ["msg1"]
+    assert result["msg1"]["thread_id"] == "thread1"
+
+
 def test_get_attachment(
     gmail_client: GmailClient, mock_gmail_service: MagicMock
 ) -> None:
@@ -233,6 +297,31 @@ def test_get_attachment(
     assert result == b"attachment data"
 
 
+def test_batch_get_attachments(
+    gmail_client: GmailClient, mock_gmail_service: MagicMock
+) -> None:
+    """Test fetching several attachments in one batch request."""
+    # Setup
+    mock_batch = mock_gmail_service.new_batch_http_request.return_value
+
+    def execute_batch(http=None):
+        callback = mock_gmail_service.new_batch_http_request.call_args.kwargs[
+            "callback"
+        ]
+        data = base64.urlsafe_b64encode(b"attachment data").decode()
+        callback("att1", {"data": data}, None)
+        callback("att2", None, Exception("Not found"))
+
+    mock_batch.execute.side_effect = execute_batch
+
+    # Execute
+    result = gmail_client.batch_get_attachments(TEST_EMAIL_ID, ["att1", "att2"])
+
+    # Verify
+    assert mock_batch.add.call_count == 2
+    assert result == {"att1": b"attachment data"}
+
+
 @pytest.fixture()
 def mock_credentials():
     """Fixture for mock credentials."""
@@ -347,11 +436,88 @@ def test_build_service(gmail_client):
         "scopes": ["https://www.googleapis.com/auth/gmail.readonly"],
     }
 
-    with patch("app.services.gmail.client.build") as mock_build:
+    with patch("app.services.gmail.client.build_from_document") as mock_build:
         gmail_client._build_service()
         mock_build.assert_called_once()
 
 
+@patch("app.services.gmail.client.Request")
+@patch("app.services.gmail.client.google.oauth2.credentials.Credentials")
+def test_build_service_refreshes_expired_token(
+    mock_credentials_class, mock_request, gmail_client
+):
+    """Test that an expired token is refreshed before building the service."""
+    mock_credentials = mock_credentials_class.return_value
+    mock_credentials.expired = True
+    mock_credentials.token = "new_token"
+    gmail_client.credentials = {
+        "token": "old_token",
+        "refresh_token": "test_refresh_token",
+        "client_id": "test_client_id",
+        "client_secret": "test_client_secret",
+    }
+
+    with patch("app.services.gmail.client.build_from_document"):
+        gmail_client._build_service()
+
+    mock_credentials.refresh.assert_called_once_with(mock_request.return_value)
+    assert gmail_client.credentials["token"] == "new_token"
+
+
+def test_clients_share_thread_connection():
+    """Test that clients reuse the current thread's connection to the API."""
+    with patch("app.services.gmail.client.build_from_document"):
+        first = GmailClient({"token": "token-1"})
+        second = GmailClient({"token": "token-2"})
+
+    first_http = first._thread_http()
+    second_http = second._thread_http()
+
+    assert first._thread_http() is first_http
+    assert second_http is not first_http
+    assert second_http.http is first_http.http
+    assert first_http.credentials.token == "token-1"
+    assert second_http.credentials.token == "token-2"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_http = executor.submit(first._thread_http).result()
+    assert other_thread_http.http is not first_http.http
+
+
+def test_quota_bucket_follows_mailbox(mock_gmail_service: MagicMock) -> None:
+    """Test that a refreshed token keeps drawing from its mailbox's bucket."""
+    client_module._token_mailboxes.clear()
+    client_module._quota_buckets.clear()
+    get_profile = mock_gmail_service.users.return_value.getProfile
+    get_profile.return_value.execute.return_value = {"emailAddress": "user@example.com"}
+
+    for token in ("old-token", "refreshed-token", "refreshed-token"):
+        client = GmailClient()
+        client.credentials = {"token": token}
+        client.service = mock_gmail_service
+        client._rate_limit_request(5)
+
+    bucket = client_module._get_quota_bucket("user@example.com")
+    assert bucket.tokens == pytest.approx(bucket.capacity - 15, abs=1)
+    # The mailbox is looked up once per token
+    assert get_profile.return_value.execute.call_count == 2
+
+
+def test_cached_mailbox_is_known_after_lookup(mock_gmail_service: MagicMock) -> None:
+    """Test that the mailbox is only reported without a request once looked up."""
+    client_module._token_mailboxes.clear()
+    get_profile = mock_gmail_service.users.return_value.getProfile
+    get_profile.return_value.execute.return_value = {"emailAddress": "user@example.com"}
+    client = GmailClient()
+    client.credentials = {"token": "test-token"}
+    client.service = mock_gmail_service
+
+    assert client.cached_mailbox() is None
+    assert client.mailbox() == "user@example.com"
+    assert client.cached_mailbox() == "user@example.com"
+    get_profile.return_value.execute.assert_called_once()
+
+
 def test_parse_email_content(gmail_client, mock_message):
     """Test parsing email content from Gmail API format."""
     result = gmail_client.parse_email_content(mock_message)
@@ -366,6 +532,78 @@ def test_parse_email_content(gmail_client, mock_message):
     assert result["attachments"][0]["filename"] == "test.pdf"
 
 
+def _split_fields(mask: str) -> list[str]:
+    """Split a partial response mask into its top-level fields."""
+    fields = []
+    depth = start = 0
+    for i, char in enumerate(mask):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and not depth:
+            fields.append(mask[start:i])
+            start = i + 1
+    fields.append(mask[start:])
+    return fields
+
+
+def _apply_fields_mask(data: Any, mask: str) -> Any:
+    """Keep only the data a Gmail partial response mask selects."""
+    if isinstance(data, list):
+        return [_apply_fields_mask(item, mask) for item in data]
+
+    selected = {}
+    for field in _split_fields(mask):
+        name, sub_mask = field, None
+        if "(" in field and ("/" not in field or field.index("(") < field.index("/")):
+            name, sub_mask = field[: field.index("(")], field[field.index("(") + 1 : -1]
+        elif "/" in field:
+            name, sub_mask = field.split("/", 1)
+        if name in data:
+            selected[name] = (
+                data[name]
+                if sub_mask is None
+                else _apply_fields_mask(data[name], sub_mask)
+            )
+    return selected
+
+
+def test_summary_fields_keep_nested_attachments(gmail_client):
+    """Test that listings see attachments deep inside forwarded messages."""
+    text_part = {"mimeType": "text/plain", "body": {"data": "VGVzdA"}}
+    alternative = {
+        "mimeType": "multipart/alternative",
+        "parts": [text_part, {"mimeType": "text/html", "body": {"data": "VGVzdA"}}],
+    }
+    forwarded = {
+        "mimeType": "message/rfc822",
+        "parts": [
+            {
+                "mimeType": "multipart/mixed",
+                "parts": [
+                    alternative,
+                    {
+                        "mimeType": "application/pdf",
+                        "filename": "report.pdf",
+                        "body": {"attachmentId": TEST_ATTACHMENT_ID},
+                    },
+                ],
+            }
+        ],
+    }
+    message = {
+        "id": TEST_EMAIL_ID,
+        "payload": {"mimeType": "multipart/mixed", "parts": [alternative, forwarded]},
+    }
+
+    summary = _apply_fields_mask(message, EMAIL_SUMMARY_FIELDS)
+    result = gmail_client.parse_email_content(summary)
+
+    assert [a["filename"] for a in result["attachments"]] == ["report.pdf"]
+    assert result["body"] == {"plain": "", "html": ""}
+
+
 def test_get_all_labels(gmail_client, mock_labels):
     """Test fetching all Gmail labels."""
     # Set up the mock
@@ -0,0 +1,45 @@
+"""Tests for the shared HTTP clients."""
+
+import asyncio
+
+import pytest
+
+from app.services.outlook.client import OutlookClient
+from app.utils.http_client import (
+    close_http_client,
+    get_http_client,
+    get_sync_http_client,
+)
+
+
+class TestHttpClient:
+    """Test cases for the shared async HTTP client."""
+
+    @pytest.mark.asyncio()
+    async def test_concurrent_callers_share_one_client(self):
+        """Test that requests resolving the dependency at once share a client."""
+        await close_http_client()
+
+        clients = await asyncio.gather(*(get_http_client() for _ in range(10)))
+
+        assert all(client is clients[0] for client in clients)
+        await close_http_client()
+        assert clients[0].is_closed
+
+
+class TestSyncHttpClient:
+    """Test cases for the shared blocking HTTP client."""
+
+    def test_client_is_shared(self):
+        """Test that every caller gets the same client."""
+        assert get_sync_http_client() is get_sync_http_client()
+        assert OutlookClient("token").http_client is get_sync_http_client()
+
+    def test_client_recreated_after_close(self):
+        """Test that closing the clients makes the next call build a new one."""
+        client = get_sync_http_client()
+
+        asyncio.run(close_http_client())
+
+        assert client.is_closed
+        assert get_sync_http_client() is not client
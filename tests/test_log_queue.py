@@ -0,0 +1,97 @@
+"""Tests for the queue-backed logging setup."""
+
+import logging
+
+import pytest
+
+from app.utils.log_queue import configure_logging, log_level, stop_logging
+
+
+class _RecordingHandler(logging.Handler):
+    """Handler that keeps the formatted records it receives."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(self.format(record))
+
+
+@pytest.fixture()
+def root_logger():
+    """Restore the root logger handlers and level after the test."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def test_records_are_written_by_listener(root_logger):
+    """Test that records reach the handlers through the queue."""
+    handler = _RecordingHandler()
+    configure_logging(logging.INFO, handler)
+
+    logging.getLogger("app.test").info("Migrated %d emails", 3)
+    logging.getLogger("app.test").debug("Hidden")
+    # Flush the queue now rather than at exit
+    stop_logging()
+
+    assert len(handler.messages) == 1
+    assert handler.messages[0].endswith("app.test - INFO - Migrated 3 emails")
+    assert root_logger.level == logging.INFO
+
+
+def test_tracebacks_are_formatted_by_listener(root_logger):
+    """Test that exceptions logged on the caller's thread keep their traceback."""
+    handler = _RecordingHandler()
+    configure_logging(logging.INFO, handler)
+
+    try:
+        raise ValueError  # noqa: TRY301
+    except ValueError:
+        logging.getLogger("app.test").exception("Error creating client")
+    stop_logging()
+
+    assert "Error creating client" in handler.messages[0]
+    assert "Traceback" in handler.messages[0]
+    assert handler.messages[0].endswith("ValueError")
+
+
+def test_arguments_are_formatted_when_logged(root_logger):
+    """Test that arguments mutated after logging don't change the message."""
+    handler = _RecordingHandler()
+    configure_logging(logging.INFO, handler)
+
+    update = {"status": "running", "logs": ["Started"]}
+    logging.getLogger("app.test").info("Update: %s", update)
+    update.pop("logs")
+    stop_logging()
+
+    assert handler.messages[0].endswith(
+        "Update: {'status': 'running', 'logs': ['Started']}"
+    )
+
+
+def test_reconfiguring_replaces_handlers(root_logger):
+    """Test that a second configuration stops writing to the first handlers."""
+    first, second = _RecordingHandler(), _RecordingHandler()
+    configure_logging(logging.INFO, first)
+    logging.getLogger("app.test").info("First")
+
+    configure_logging(logging.INFO, second)
+    logging.getLogger("app.test").info("Second")
+    stop_logging()
+
+    assert [m.rsplit(" - ", 1)[-1] for m in first.messages] == ["First"]
+    assert [m.rsplit(" - ", 1)[-1] for m in second.messages] == ["Second"]
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [("DEBUG", logging.DEBUG), ("warning", logging.WARNING), ("LOUD", logging.INFO)],
+)
+def test_log_level(name, expected):
+    """Test that level names resolve case-insensitively with an INFO fallback."""
+    assert log_level(name) == expected
@@ -1,12 +1,17 @@
 """Tests for the main application module."""
 
+import logging
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-# Mock the logging setup before importing the app
-with patch("logging.FileHandler"), patch("logging.basicConfig"):
+# Don't write a log file while importing the app
+with patch(
+    "logging.handlers.RotatingFileHandler",
+    lambda *_args, **_kwargs: logging.NullHandler(),
+):
+    from app import main
     from app.main import app
 
 client = TestClient(app)
@@ -32,6 +37,21 @@ class TestMainApp:
         assert "<title>" in html_content
         assert "Gmail Migrator" in html_content
 
+    def test_root_is_rendered_once_per_base_url(self, client):
+        """Test that the home page is reused for requests to the same host."""
+        main._index_pages.clear()
+        with patch.object(
+            main, "index_template", wraps=main.index_template
+        ) as mock_template:
+            first = client.get("/")
+            second = client.get("/")
+            other = client.get("/", headers={"host": "other.example.com"})
+
+        assert first.text == second.text
+        assert mock_template.render.call_count == 2
+        assert "http://other.example.com/static/" in other.text
+        assert "http://other.example.com/static/" not in first.text
+
     def test_static_files_served(self, client):
         """Test that static files are properly served."""
         # This test assumes there's a CSS file in the static directory
@@ -39,6 +59,19 @@ class TestMainApp:
         assert response.status_code == 200
         assert "text/css" in response.headers["content-type"]
 
+    def test_health_endpoint(self, client):
+        """Test that the health check reports the service as healthy."""
+        for _ in range(2):
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            assert response.json() == {"status": "healthy"}
+
+    def test_access_log_follows_debug(self):
+        """Test that uvicorn's per-request log lines are off outside debug mode."""
+        access_logger = logging.getLogger("uvicorn.access")
+        assert access_logger.isEnabledFor(logging.INFO) is main.settings.DEBUG
+
     def test_docs_endpoint(self, client):
         """Test the /docs endpoint is accessible."""
         response = client.get("/docs")
@@ -0,0 +1,383 @@
+"""Tests for the migration router state broadcasting."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.api.routers import migration
+from app.api.routers.migration import (
+    CredentialsModel,
+    CredentialsRequest,
+    DestinationCredentialsModel,
+    MigrationJob,
+)
+
+
+def _load_message(message: bytes) -> dict:
+    """Decode the state carried by an encoded SSE message."""
+    assert message.startswith(b"data: ")
+    assert message.endswith(b"\r\n\r\n")
+    return orjson.loads(message.removeprefix(b"data: "))
+
+
+@pytest.fixture()
+def job():
+    """Create a fresh migration job bound to the running test loop."""
+    return MigrationJob(job_id="test-job")
+
+
+@pytest.fixture(autouse=True)
+def _clear_jobs(monkeypatch):
+    """Isolate the migration job registry between tests."""
+    monkeypatch.setattr(migration, "default_job", MigrationJob(job_id="default"))
+    migration.migration_jobs.clear()
+    migration._running_jobs.clear()
+    yield
+    migration.migration_jobs.clear()
+    migration._running_jobs.clear()
+
+
+@pytest.fixture()
+def credentials():
+    """Create migration credentials and isolate the client pools."""
+    migration._gmail_clients.clear()
+    migration._outlook_clients.clear()
+    migration._migration_services.clear()
+    yield CredentialsRequest(
+        gmail=CredentialsModel(token="gmail-token", refresh_token="refresh"),
+        destination=DestinationCredentialsModel(
+            token="graph-token", provider="outlook"
+        ),
+    )
+    migration._gmail_clients.clear()
+    migration._outlook_clients.clear()
+    migration._migration_services.clear()
+
+
+class TestMigrationJob:
+    """Tests for MigrationJob and its registry."""
+
+    def test_logs_are_bounded(self, job):
+        """Test that only the newest log entries are kept."""
+        for i in range(migration.MAX_LOG_ENTRIES + 5):
+            job.logs.append(f"entry {i}")
+
+        logs = job.to_dict()["logs"]
+        assert len(logs) == migration.MAX_LOG_ENTRIES
+        assert logs[0] == "entry 5"
+
+    def test_get_migration_job(self):
+        """Test that jobs are created on first lookup and reused afterwards."""
+        assert migration.get_migration_job(None) is migration.default_job
+
+        job = migration.get_migration_job("abc")
+        assert job.job_id == "abc"
+        assert migration.get_migration_job("abc") is job
+        assert migration.get_migration_job("other") is not job
+
+
+@patch("app.api.routers.migration.OutlookClient")
+@patch("app.api.routers.migration.GmailClient")
+class TestClientPool:
+    """Tests for the pooled Gmail and Outlook clients."""
+
+    def test_clients_are_reused(self, mock_gmail, mock_outlook, credentials):
+        """Test that the same credentials get the same client instances."""
+        gmail_client = migration._get_gmail_client(credentials.gmail)
+        outlook_client = migration._get_outlook_client(credentials.destination.token)
+
+        assert migration._get_gmail_client(credentials.gmail) is gmail_client
+        assert migration._get_outlook_client("graph-token") is outlook_client
+        mock_gmail.assert_called_once()
+        mock_outlook.assert_called_once_with(access_token="graph-token")
+
+    def test_evict_clients(self, mock_gmail, mock_outlook, credentials):
+        """Test that evicted credentials get fresh clients."""
+        gmail_client = migration._get_gmail_client(credentials.gmail)
+        migration._get_outlook_client(credentials.destination.token)
+        assert mock_outlook.call_count == 1
+
+        migration._evict_clients(credentials)
+
+        assert len(migration._gmail_clients) == 0
+        assert len(migration._outlook_clients) == 0
+        mock_gmail.side_effect = [object()]
+        assert migration._get_gmail_client(credentials.gmail) is not gmail_client
+
+    @patch("app.api.routers.migration.GmailToOutlookMigrationService")
+    def test_migration_service_is_reused(
+        self, mock_service, mock_gmail, mock_outlook, credentials
+    ):
+        """Test that a service and its folder mapping survive across requests."""
+        mock_service.side_effect = lambda **_: MagicMock(status_events=None)
+        mock_gmail.side_effect = lambda **_: MagicMock()
+        gmail_client = migration._get_gmail_client(credentials.gmail)
+        outlook_client = migration._get_outlook_client(credentials.destination.token)
+
+        service = migration._get_migration_service(gmail_client, outlook_client)
+        service.folder_mapping = {"INBOX": "inbox-folder"}
+
+        assert migration._get_migration_service(gmail_client, outlook_client) is service
+        other = migration._get_migration_service(MagicMock(), outlook_client)
+        assert other is not service
+        assert mock_outlook.call_count == 1
+
+    @patch("app.api.routers.migration.GmailToOutlookMigrationService")
+    def test_busy_migration_service_is_not_shared(
+        self, mock_service, mock_gmail, mock_outlook, credentials
+    ):
+        """Test that a running service is copied rather than shared."""
+        mock_service.side_effect = lambda **_: MagicMock(status_events=None)
+        gmail_client = migration._get_gmail_client(credentials.gmail)
+        outlook_client = migration._get_outlook_client(credentials.destination.token)
+
+        service = migration._get_migration_service(gmail_client, outlook_client)
+        service.folder_mapping = {"INBOX": "inbox-folder"}
+        service.status_events = asyncio.Queue()
+
+        copy = migration._get_migration_service(gmail_client, outlook_client)
+        assert copy is not service
+        assert copy.folder_mapping == {"INBOX": "inbox-folder"}
+        assert mock_gmail.call_count == 1
+        assert mock_outlook.call_count == 1
+
+
+def test_credentials_are_immutable(credentials):
+    """Test that pooled clients can't be mismatched by mutating credentials."""
+    with pytest.raises(ValidationError):
+        credentials.gmail.token = "other-token"
+
+
+@pytest.mark.asyncio()
+@patch("app.api.routers.migration.OutlookClient")
+@patch("app.api.routers.migration.GmailClient")
+async def test_get_clients(mock_gmail, mock_outlook, credentials):
+    """Test that both pooled clients are returned for a request."""
+    gmail_client, outlook_client = await migration._get_clients(credentials)
+
+    assert gmail_client is mock_gmail.return_value
+    assert outlook_client is mock_outlook.return_value
+    assert migration._get_gmail_client(credentials.gmail) is gmail_client
+
+
+def test_validate_credentials_logs_once(credentials, caplog):
+    """Test that a rejected provider raises a 400 with a single log record."""
+    credentials = credentials.model_copy(
+        update={
+            "destination": DestinationCredentialsModel(token="t", provider="aol"),
+        }
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        migration._validate_credentials(credentials)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Unsupported destination provider: aol"
+    assert len(caplog.records) == 1
+
+
+@pytest.mark.asyncio()
+async def test_unexpected_error_logs_once(credentials, caplog):
+    """Test that an unexpected migration error is logged once, with its cause."""
+    request = migration.LabelMigrationRequest(credentials=credentials)
+
+    with (
+        patch.object(migration, "_get_clients", side_effect=RuntimeError("boom")),
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await migration.migrate_labels_to_folders(request, MagicMock())
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Failed to migrate labels: boom"
+    assert len(caplog.records) == 1
+    assert isinstance(caplog.records[0].exc_info[1], RuntimeError)
+
+
+class TestUpdateMigrationState:
+    """Tests for update_migration_state."""
+
+    @pytest.mark.asyncio()
+    async def test_update_serializes_state_once(self, job):
+        """Test that an update refreshes the shared payload and version."""
+        await migration.update_migration_state(
+            job, {"status": "running", "processed_emails": 3, "logs": "[00:00:00] Hi"}
+        )
+        await job.pending_publish
+
+        assert job.status == "running"
+        assert job.version == 1
+        payload = _load_message(job.payload)
+        assert payload["job_id"] == "test-job"
+        assert payload["status"] == "running"
+        assert payload["processed_emails"] == 3
+        assert payload["logs"] == ["[00:00:00] Hi"]
+
+    @pytest.mark.asyncio()
+    async def test_updates_are_coalesced(self, job):
+        """Test that a burst of updates is broadcast as one snapshot."""
+        for processed in range(1, 11):
+            await migration.update_migration_state(
+                job, {"processed_emails": processed, "logs": f"Processed {processed}"}
+            )
+
+        assert job.processed_emails == 10
+        assert job.version == 0
+
+        await job.pending_publish
+
+        assert job.version == 1
+        payload = _load_message(job.payload)
+        assert payload["processed_emails"] == 10
+        assert len(payload["logs"]) == 10
+
+    @pytest.mark.asyncio()
+    async def test_terminal_status_is_published_immediately(self, job):
+        """Test that a terminal status skips the coalescing delay."""
+        await migration.update_migration_state(job, {"processed_emails": 1})
+        await migration.update_migration_state(job, {"status": "completed"})
+
+        assert job.pending_publish is None
+        assert job.version == 1
+        assert _load_message(job.payload)["status"] == "completed"
+
+    @pytest.mark.asyncio()
+    async def test_update_wakes_all_subscribers(self, job):
+        """Test that every waiting subscriber is notified of a new version."""
+
+        async def subscriber() -> bytes:
+            async with job.cond:
+                await job.cond.wait_for(lambda: job.version != 0)
+                return job.payload
+
+        waiters = [asyncio.create_task(subscriber()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        await migration.update_migration_state(job, {"status": "completed"})
+        payloads = await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+
+        assert all(_load_message(p)["status"] == "completed" for p in payloads)
+
+    @pytest.mark.asyncio()
+    async def test_jobs_are_isolated(self, job):
+        """Test that updating one job leaves other jobs untouched."""
+        other = MigrationJob(job_id="other-job")
+
+        await migration.update_migration_state(job, {"status": "completed"})
+
+        assert other.status == "idle"
+        assert other.version == 0
+
+
+class TestStateEvents:
+    """Tests for the SSE state event stream."""
+
+    @pytest.mark.asyncio()
+    async def test_stream_starts_with_current_state(self, job):
+        """Test that a new subscriber first receives the current state."""
+        await migration.update_migration_state(job, {"status": "completed"})
+
+        events = migration._state_events(job)
+        first = await anext(events)
+        await events.aclose()
+
+        assert _load_message(first)["status"] == "completed"
+
+    @pytest.mark.asyncio()
+    async def test_lagging_subscriber_skips_to_latest_state(self, job):
+        """Test that a slow subscriber receives only the newest snapshot."""
+        events = migration._state_events(job)
+        await anext(events)
+
+        for processed in range(1, 4):
+            await migration.update_migration_state(job, {"processed_emails": processed})
+        await job.pending_publish
+
+        latest = await asyncio.wait_for(anext(events), timeout=1)
+        await events.aclose()
+
+        assert _load_message(latest)["processed_emails"] == 3
+
+
+class TestReportProgress:
+    """Tests for forwarding migration service progress to a job."""
+
+    @pytest.mark.asyncio()
+    async def test_queued_updates_are_applied_in_order(self, job):
+        """Test that every queued update is applied before the context exits."""
+        service = MagicMock()
+
+        async with migration._report_progress(job, service):
+            for processed in range(1, 6):
+                await service.status_events.put(
+                    {"processed_emails": processed, "logs": f"Processed {processed}"}
+                )
+
+        assert service.status_events is None
+        assert job.processed_emails == 5
+        assert [log[-11:] for log in job.logs] == [
+            f"Processed {i}" for i in range(1, 6)
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_updates_between_awaits_are_coalesced(self, job):
+        """Test that updates applied as the migration awaits share a broadcast."""
+        service = MagicMock()
+
+        async with migration._report_progress(job, service):
+            for processed in range(1, 6):
+                await service.status_events.put({"processed_emails": processed})
+                # Let the publisher apply the update, as an awaited API call does
+                await asyncio.sleep(0)
+            assert job.processed_emails == 5
+            assert job.version == 0
+
+        await job.pending_publish
+        assert job.version == 1
+        assert _load_message(job.payload)["processed_emails"] == 5
+
+    @pytest.mark.asyncio()
+    async def test_progress_is_broadcast_while_migrating(self, job, monkeypatch):
+        """Test that a slow migration's progress reaches clients as it runs."""
+        monkeypatch.setattr(migration, "STATE_COALESCE_DELAY", 0.01)
+        service = MagicMock()
+
+        async with migration._report_progress(job, service):
+            await service.status_events.put({"processed_emails": 1})
+            await asyncio.to_thread(time.sleep, 0.05)
+            assert job.version == 1
+            assert _load_message(job.payload)["processed_emails"] == 1
+
+    @pytest.mark.asyncio()
+    async def test_running_job_is_not_evicted(self):
+        """Test that new job ids can't evict a job whose migration is running."""
+        job = migration.get_migration_job("running-job")
+
+        async with migration._report_progress(job, MagicMock()):
+            for i in range(migration.MAX_MIGRATION_JOBS + 1):
+                migration.get_migration_job(f"job-{i}")
+            assert migration.get_migration_job("running-job") is job
+
+        # The finished job is kept for clients checking on it
+        assert migration.get_migration_job("running-job") is job
+        assert migration._running_jobs == {}
+
+    @pytest.mark.asyncio()
+    async def test_one_publish_reaches_every_stream(self, job):
+        """Test that all open streams wake on a single broadcast."""
+        streams = [migration._state_events(job) for _ in range(3)]
+        for stream in streams:
+            await anext(stream)
+
+        pending = [asyncio.ensure_future(anext(stream)) for stream in streams]
+        await asyncio.sleep(0)
+        await migration.update_migration_state(job, {"status": "completed"})
+        payloads = await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+        for stream in streams:
+            await stream.aclose()
+        assert {_load_message(p)["status"] for p in payloads} == {"completed"}
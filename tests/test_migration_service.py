@@ -1,5 +1,7 @@
 """Tests for the Gmail to Outlook migration service."""
 
+import asyncio
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -119,6 +121,39 @@ class TestGmailToOutlookMigrationService:
         )
         assert migration_service.outlook_client.migrate_email.call_count == 2
 
+    @pytest.mark.asyncio()
+    async def test_api_calls_leave_event_loop_free(self, migration_service):
+        """Test that progress is delivered while an email is being migrated."""
+        migration_service.folder_mapping = {"label1": "folder1"}
+        migration_service.gmail_client.get_emails_with_labels.return_value = [
+            {"id": "email1", "threadId": "thread1"}
+        ]
+        migration_service.gmail_client.list_labels = AsyncMock(return_value=[])
+        migration_service.status_events = asyncio.Queue()
+        progress_seen = threading.Event()
+
+        def migrate_email(*_args):
+            # Only finishes once the event loop has handled the progress update
+            if not progress_seen.wait(timeout=1):
+                raise TimeoutError
+            return {"id": "new_email_id"}
+
+        migration_service.outlook_client.migrate_email.side_effect = migrate_email
+
+        migration = asyncio.create_task(
+            migration_service.migrate_emails_by_label("label1")
+        )
+        while True:
+            update = await asyncio.wait_for(
+                migration_service.status_events.get(), timeout=1
+            )
+            if update.get("logs", "").startswith("Processing email 1/1"):
+                break
+        progress_seen.set()
+        result = await migration
+
+        assert result["successful"] == 1
+
     @pytest.mark.asyncio()
     async def test_migrate_emails_by_label_with_error(self, migration_service):
         """Test migrating emails by label with an error."""
@@ -199,3 +234,19 @@ class TestGmailToOutlookMigrationService:
         assert migration_service.migrate_emails_by_label.call_count == 2
         migration_service.migrate_emails_by_label.assert_any_call("label1", 10)
         migration_service.migrate_emails_by_label.assert_any_call("label2", 10)
+
+    @pytest.mark.asyncio()
+    async def test_update_status_queues_events(self, migration_service):
+        """Test that status updates are queued for the progress reporter."""
+        migration_service.status_events = asyncio.Queue()
+
+        await migration_service._update_status({"processed_labels": 1})
+
+        assert migration_service.status_events.get_nowait() == {"processed_labels": 1}
+
+    @pytest.mark.asyncio()
+    async def test_update_status_without_queue(self, migration_service):
+        """Test that status updates are dropped when nobody reports progress."""
+        await migration_service._update_status({"processed_labels": 1})
+
+        assert migration_service.status_events is None
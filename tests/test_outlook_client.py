@@ -0,0 +1,86 @@
+"""Tests for the Outlook client."""
+
+import base64
+
+import httpx
+import orjson
+import pytest
+
+from app.services.outlook.client import (
+    MAX_INLINE_ATTACHMENT_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    OutlookClient,
+)
+
+UPLOAD_URL = "https://outlook.office.com/api/upload/session-1"
+
+
+@pytest.fixture()
+def sent_requests():
+    """Collect the requests sent by the client under test."""
+    return []
+
+
+@pytest.fixture()
+def outlook_client(sent_requests):
+    """Create an Outlook client backed by a mock Graph API."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        if request.url.path.endswith("/createUploadSession"):
+            return httpx.Response(200, json={"uploadUrl": UPLOAD_URL})
+        if str(request.url) == UPLOAD_URL:
+            return httpx.Response(201, headers={"Location": "attachment-url"})
+        return httpx.Response(201, json={"id": "attachment-id"})
+
+    return OutlookClient(
+        "graph-token", http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+
+def test_add_small_attachment_inline(outlook_client, sent_requests):
+    """Test that a small attachment is posted as one JSON body."""
+    result = outlook_client.add_attachment("msg1", "notes.txt", b"hello")
+
+    assert result == {"id": "attachment-id"}
+    assert len(sent_requests) == 1
+    body = orjson.loads(sent_requests[0].content)
+    assert body["name"] == "notes.txt"
+    assert body["contentType"] == "text/plain"
+    assert base64.b64decode(body["contentBytes"]) == b"hello"
+
+
+def test_add_large_attachment_in_chunks(outlook_client, sent_requests):
+    """Test that a large attachment is uploaded through an upload session."""
+    content = bytes(range(256)) * (MAX_INLINE_ATTACHMENT_SIZE // 256 + 1)
+
+    result = outlook_client.add_attachment("msg1", "big.bin", content)
+
+    assert result["location"] == "attachment-url"
+    session_request, *chunk_requests = sent_requests
+    assert orjson.loads(session_request.content)["AttachmentItem"]["size"] == len(
+        content
+    )
+    assert len(chunk_requests) == -(-len(content) // UPLOAD_CHUNK_SIZE)
+    assert all("Authorization" not in r.headers for r in chunk_requests)
+    assert chunk_requests[-1].headers["Content-Range"].endswith(f"/{len(content)}")
+    assert b"".join(r.content for r in chunk_requests) == content
+
+
+def test_migrate_email_consumes_attachments_lazily(outlook_client, sent_requests):
+    """Test that each attachment is only pulled once the previous one is sent."""
+    pulled_after = []
+
+    def attachments():
+        for name in ("a.txt", "b.txt"):
+            pulled_after.append(len(sent_requests))
+            yield {"name": name, "content": b"data", "contentType": "text/plain"}
+
+    result = outlook_client.migrate_email(
+        gmail_message={"subject": "Hi", "body": "Hello"}, attachments=attachments()
+    )
+
+    assert result == {"id": "attachment-id"}
+    # One request creates the message, then one is sent per attachment
+    assert pulled_after == [1, 2]
+    assert len(sent_requests) == 3
@@ -0,0 +1,182 @@
+"""Tests for the Outlook router helpers."""
+
+import asyncio
+import base64
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from app.api.routers import outlook
+
+
+def _make_token(claims: dict) -> str:
+    """Build an unsigned JWT carrying the given claims."""
+    payload = base64.urlsafe_b64encode(orjson.dumps(claims)).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Isolate the Outlook router caches between tests."""
+    outlook._token_payloads.clear()
+    outlook._auth_managers.clear()
+    outlook._profile_emails.clear()
+    outlook._default_auth_url.cache_clear()
+    yield
+    outlook._token_payloads.clear()
+    outlook._auth_managers.clear()
+    outlook._profile_emails.clear()
+    outlook._default_auth_url.cache_clear()
+
+
+class TestExtractEmailFromToken:
+    """Tests for extracting the user email from an access token."""
+
+    def test_email_claim_priority(self):
+        """Test that the email claim is preferred over the UPN."""
+        token_info = {
+            "access_token": _make_token(
+                {"upn": "upn@example.com", "email": "user@example.com"}
+            )
+        }
+
+        assert outlook._extract_email_from_token(token_info) == "user@example.com"
+
+    def test_empty_claim_falls_through(self):
+        """Test that an empty email claim doesn't hide the UPN."""
+        token_info = {
+            "access_token": _make_token({"email": "", "upn": "u@example.com"})
+        }
+
+        assert outlook._extract_email_from_token(token_info) == "u@example.com"
+
+    def test_url_safe_payload(self):
+        """Test that payloads using the URL-safe base64 alphabet are decoded."""
+        # The "???" claim puts a "_" into the URL-safe encoded payload
+        token_info = {"access_token": _make_token({"upn": "u@example.com", "x": "???"})}
+
+        assert outlook._extract_email_from_token(token_info) == "u@example.com"
+
+    @pytest.mark.parametrize("name", ["a", "ab", "abc", "abcd"])
+    def test_payload_padding(self, name):
+        """Test that payloads of every length are padded before decoding."""
+        email = f"{name}@example.com"
+        token_info = {"access_token": _make_token({"upn": email})}
+
+        assert outlook._extract_email_from_token(token_info) == email
+
+    def test_payload_is_decoded_once(self):
+        """Test that the same token is only decoded once."""
+        token_info = {"access_token": _make_token({"upn": "user@example.com"})}
+
+        with patch(
+            "app.api.routers.outlook.orjson.loads", wraps=orjson.loads
+        ) as mock_loads:
+            assert outlook._extract_email_from_token(token_info) == "user@example.com"
+            assert outlook._extract_email_from_token(token_info) == "user@example.com"
+
+        mock_loads.assert_called_once()
+
+    def test_opaque_token(self):
+        """Test that a token that is not a JWT yields the default value."""
+        token_info = {"access_token": "opaque-token"}
+
+        assert outlook._extract_email_from_token(token_info) == "Microsoft Account"
+
+
+@patch("app.api.routers.outlook.OutlookAuthManager")
+def test_auth_managers_are_reused(mock_manager):
+    """Test that one auth manager is built per OAuth configuration."""
+    config = outlook.OAuthConfig(client_id="id", client_secret="secret")
+
+    auth_manager = outlook._get_auth_manager(config)
+
+    assert outlook._get_auth_manager(config.model_copy()) is auth_manager
+    auth_config = mock_manager.call_args.args[0]
+    assert auth_config.client_id == "id"
+    assert auth_config.redirect_uri == config.redirect_uri
+
+    other = outlook.OAuthConfig(client_id="id", client_secret="other")
+    outlook._get_auth_manager(other)
+    assert mock_manager.call_count == 2
+
+
+@pytest.mark.asyncio()
+@patch("app.api.routers.outlook.outlook_oauth_flow")
+async def test_default_auth_url_is_built_once(mock_flow):
+    """Test that the default authorization URL is reused across requests."""
+    mock_flow.get_authorization_url.return_value = "https://login.example.com"
+
+    assert await outlook.get_auth_url() == {"auth_url": "https://login.example.com"}
+    assert await outlook.get_auth_url() == {"auth_url": "https://login.example.com"}
+    mock_flow.get_authorization_url.assert_called_once()
+
+
+@patch("app.api.routers.outlook.OutlookClient")
+def test_profile_email_is_cached(mock_client_class):
+    """Test that the Graph profile is requested once per token."""
+    mock_client_class.return_value.get_user_profile.return_value = {
+        "mail": "user@example.com"
+    }
+
+    assert outlook._get_user_profile_email("graph-token") == "user@example.com"
+    assert outlook._get_user_profile_email("graph-token") == "user@example.com"
+    mock_client_class.return_value.get_user_profile.assert_called_once()
+
+
+@patch("app.api.routers.outlook.OutlookClient")
+def test_failed_profile_lookup_is_not_cached(mock_client_class):
+    """Test that a failed profile request is retried on the next callback."""
+    mock_client_class.return_value.get_user_profile.side_effect = [
+        RuntimeError,
+        {"userPrincipalName": "user@example.com"},
+    ]
+
+    assert outlook._get_user_profile_email("graph-token") == "Microsoft Account"
+    assert outlook._get_user_profile_email("graph-token") == "user@example.com"
+
+
+@pytest.mark.parametrize(
+    ("profile", "expected"),
+    [
+        (
+            {"mail": "a@example.com", "userPrincipalName": "b@example.com"},
+            "a@example.com",
+        ),
+        ({"mail": None, "userPrincipalName": "b@example.com"}, "b@example.com"),
+        ({"otherMails": ["c@example.com"]}, "c@example.com"),
+        ({"otherMails": [], "displayName": "x@example.com"}, "Microsoft Account"),
+    ],
+)
+@patch("app.api.routers.outlook.OutlookClient")
+def test_profile_email_field_priority(mock_client_class, profile, expected):
+    """Test that only the known email fields are used, in priority order."""
+    mock_client_class.return_value.get_user_profile.return_value = profile
+
+    assert outlook._get_user_profile_email("graph-token") == expected
+
+
+@pytest.mark.asyncio()
+async def test_batch_migrate_concurrency_is_bounded(monkeypatch):
+    """Test that batch_migrate never runs more migrations than the limit."""
+    monkeypatch.setattr(outlook, "BATCH_MIGRATE_CONCURRENCY", 2)
+    running = 0
+    peak = 0
+
+    async def copy_email(*_args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"id": "outlook-id"}
+
+    monkeypatch.setattr(outlook, "_copy_email_to_outlook", copy_email)
+
+    results = await outlook.batch_migrate(
+        [f"m{i}" for i in range(6)], MagicMock(), MagicMock()
+    )
+
+    assert results["successful"] == 6
+    assert peak == 2
@@ -3,7 +3,9 @@
 import time
 from unittest.mock import patch
 
-from app.utils.rate_limiter import RateLimiter, rate_limited
+import pytest
+
+from app.utils.rate_limiter import RateLimiter, TokenBucket, rate_limited
 
 
 class TestRateLimiter:
@@ -102,6 +104,56 @@ class TestRateLimiter:
         mock_sleep.assert_called_once_with(60.0)
 
 
+class TestTokenBucket:
+    """Test cases for the TokenBucket class."""
+
+    @patch("time.sleep")
+    @patch("time.monotonic")
+    def test_burst_within_capacity(self, mock_monotonic, mock_sleep):
+        """Test that a burst up to the capacity doesn't wait."""
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(capacity=10, period=60.0)
+
+        for _ in range(10):
+            bucket.acquire()
+
+        mock_sleep.assert_not_called()
+        assert bucket.tokens == 0
+
+    @patch("time.sleep")
+    @patch("time.monotonic")
+    def test_acquire_waits_for_refill(self, mock_monotonic, mock_sleep):
+        """Test waiting when the bucket doesn't hold enough tokens."""
+        mock_monotonic.side_effect = [100.0, 100.0, 100.0, 106.0]
+        bucket = TokenBucket(capacity=10, period=60.0)
+
+        bucket.acquire(10)
+        # One token refills every 6 seconds
+        bucket.acquire(1)
+
+        mock_sleep.assert_called_once_with(pytest.approx(6.0))
+        assert bucket.tokens == pytest.approx(0)
+
+    @patch("time.monotonic")
+    def test_refill_is_capped(self, mock_monotonic):
+        """Test that an idle bucket never exceeds its capacity."""
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(capacity=10, period=60.0)
+        bucket.acquire(4)
+
+        mock_monotonic.return_value = 1000.0
+        bucket.acquire(1)
+
+        assert bucket.tokens == 9
+
+    def test_acquire_more_than_capacity(self):
+        """Test that requesting more tokens than the capacity fails."""
+        bucket = TokenBucket(capacity=10)
+
+        with pytest.raises(ValueError, match="Cannot acquire"):
+            bucket.acquire(11)
+
+
 class TestRateLimitedDecorator:
     """Test cases for the rate_limited decorator."""
 
@@ -0,0 +1,33 @@
+"""Tests for the signing utilities."""
+
+from unittest.mock import patch
+
+from app.utils.signing import sign_value, unsign_value
+
+
+def test_sign_and_unsign():
+    """Test that signed values round-trip."""
+    signed = sign_value({"token": "test_token"})
+
+    assert unsign_value(signed, max_age=60) == {"token": "test_token"}
+
+
+def test_unsign_tampered_value():
+    """Test that a modified payload or signature is rejected."""
+    signed = sign_value({"token": "test_token"})
+    payload, signature = signed.split(".")
+    forged = sign_value({"token": "other_token"}).split(".")[0]
+
+    assert unsign_value(f"{forged}.{signature}", max_age=60) is None
+    assert unsign_value(f"{payload}.{signature[:-2]}", max_age=60) is None
+    assert unsign_value("not-a-signed-value", max_age=60) is None
+
+
+@patch("time.time")
+def test_unsign_expired_value(mock_time):
+    """Test that values older than max_age are rejected."""
+    mock_time.return_value = 1000.0
+    signed = sign_value({"token": "test_token"})
+
+    mock_time.return_value = 1061.0
+    assert unsign_value(signed, max_age=60) is None
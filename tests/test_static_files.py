@@ -0,0 +1,73 @@
+"""Tests for the versioned static files."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.static_files import (
+    VERSIONED_MAX_AGE,
+    VersionedStaticFiles,
+    content_version,
+)
+
+
+@pytest.fixture()
+def static_dir(tmp_path):
+    """Create a directory with a couple of static files."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "styles.css").write_text("body {}")
+    (tmp_path / "main.js").write_text("let a = 1;")
+    return tmp_path
+
+
+@pytest.fixture()
+def static_files(static_dir):
+    """Create the static files app for the directory."""
+    return VersionedStaticFiles(static_dir)
+
+
+@pytest.fixture()
+def client(static_files):
+    """Create a client for an app serving the static files."""
+    app = FastAPI()
+    app.mount("/static", static_files, name="static")
+    return TestClient(app)
+
+
+def test_content_version_tracks_changes(static_dir):
+    """Test that the version changes when a file is edited or added."""
+    version = content_version(static_dir)
+    assert content_version(static_dir) == version
+
+    (static_dir / "main.js").write_text("let a = 2;")
+    edited = content_version(static_dir)
+    assert edited != version
+
+    (static_dir / "extra.js").write_text("")
+    assert content_version(static_dir) != edited
+
+
+def test_versioned_request_is_immutable(client, static_files):
+    """Test that a request for the current version may be cached for good."""
+    response = client.get(f"/static/css/styles.css?v={static_files.version}")
+
+    assert response.status_code == 200
+    assert response.text == "body {}"
+    assert response.headers["cache-control"] == (
+        f"public, max-age={VERSIONED_MAX_AGE}, immutable"
+    )
+
+
+@pytest.mark.parametrize("query", ["", "?v=stale"])
+def test_other_requests_revalidate(client, query):
+    """Test that unversioned and stale requests must be revalidated."""
+    response = client.get(f"/static/main.js{query}")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get(
+        f"/static/main.js{query}",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304